@@ -11,7 +11,7 @@ from sqlalchemy import select
 from pydantic import BaseModel, EmailStr
 
 from app.core.database import get_async_db
-from app.core.security import security
+from app.core import security
 from app.core.logging_simple import security_logger
 from app.models.user import User, UserSession
 from app.schemas.auth import (
@@ -405,6 +405,8 @@ async def logout(
                 if session:
                     session.revoke("logout")
                     await db.commit()
+            
+            security.invalidate_token(token)
         
         # Log logout
         ip_address = http_request.client.host if http_request else None
@@ -501,10 +503,12 @@ async def change_password(
             )
         
         # Update password
+        old_password_hash = current_user.password_hash
         current_user.password_hash = security.hash_password(request.new_password)
         current_user.password_changed_at = datetime.utcnow()
         
         await db.commit()
+        security.invalidate_password_hash(old_password_hash)
         
         # Log password change
         ip_address = http_request.client.host if http_request else None
@@ -3,10 +3,9 @@ Report generation and management endpoints
 """
 
 import os
-from pathlib import Path
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
@@ -15,7 +14,7 @@ from app.api.v1.auth import get_current_user
 from app.models.user import User
 from app.models.scan import Scan, ScanStatus
 from app.models.report import Report, ReportFormat, ReportStatus
-from app.services.report_service import ReportService
+from app.services.report_service import ReportService, forget_report_file, report_file_exists
 from app.schemas.report import (
     ReportCreateRequest, ReportResponse, ReportListResponse,
     ReportStatusResponse, ReportStatsResponse
@@ -113,10 +112,11 @@ async def list_reports(
     scan_id: Optional[str] = Query(None, description="Filtrar por ID do scan"),
     page: int = Query(1, ge=1, description="Número da página"),
     per_page: int = Query(20, ge=1, le=100, description="Itens por página"),
+    layout: str = Query("rows", pattern="^(rows|columns)$", description="Formato da lista (rows, columns)"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_db)
 ):
-    """List user reports with pagination and filtering"""
+    """List user reports with pagination and filtering (layout=columns returns one array per field)"""
     
     try:
         # Build query - only reports for scans owned by the user
@@ -139,6 +139,9 @@ async def list_reports(
         result = await db.execute(query)
         reports = result.scalars().all()
         
+        if layout == "columns":
+            return ORJSONResponse(ReportListResponse.columns(reports, total, page, per_page))
+        
         # Convert to response format
         report_responses = []
         for report in reports:
@@ -319,7 +322,7 @@ async def download_report(
                 detail="Relatório ainda não está pronto para download"
             )
         
-        if not report.file_path or not Path(report.file_path).exists():
+        if not report.file_path or not await report_file_exists(report.file_path):
             logger.error(f"Report file not found: {report.file_path}")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -385,12 +388,14 @@ async def delete_report(
             )
         
         # Delete file if exists
-        if report.file_path and Path(report.file_path).exists():
+        if report.file_path and await report_file_exists(report.file_path):
             try:
                 os.remove(report.file_path)
                 logger.info(f"Deleted report file: {report.file_path}")
             except Exception as e:
                 logger.warning(f"Failed to delete report file: {e}")
+            finally:
+                forget_report_file(report.file_path)
         
         # Delete database record
         await db.delete(report)
@@ -434,17 +439,17 @@ async def list_scan_reports(
                 detail="Scan não encontrado"
             )
         
-        # Get scan reports
-        result = await db.execute(
+        # Stream scan reports in batches rather than loading every row at once
+        reports = await db.stream_scalars(
             select(Report)
             .where(Report.scan_id == scan_id)
             .order_by(Report.created_at.desc())
+            .execution_options(yield_per=100)
         )
-        reports = result.scalars().all()
         
         # Convert to response format
         report_responses = []
-        for report in reports:
+        async for report in reports:
             report_responses.append(ReportResponse(
                 id=str(report.id),
                 scan_id=str(report.scan_id),
@@ -5,6 +5,7 @@ Scan management endpoints
 from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, desc
 from sqlalchemy.orm import selectinload
@@ -288,10 +289,11 @@ async def list_scans(
     per_page: int = Query(20, ge=1, le=100, description="Itens por página"),
     status: Optional[ScanStatus] = Query(None, description="Filtrar por status"),
     target: Optional[str] = Query(None, description="Filtrar por URL alvo"),
+    layout: str = Query("rows", pattern="^(rows|columns)$", description="Formato da lista (rows, columns)"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_db)
 ):
-    """List user scans"""
+    """List user scans (layout=columns returns one array per field)"""
     service = ScanService(db)
     
     result = await service.list_scans(
@@ -302,6 +304,11 @@ async def list_scans(
         target_filter=target
     )
     
+    if layout == "columns":
+        return ORJSONResponse(ScanListResponse.columns(
+            result["scans"], result["total"], result["page"], result["per_page"]
+        ))
+    
     scan_responses = []
     for scan in result["scans"]:
         scan_responses.append(ScanResponse(
@@ -9,7 +9,7 @@ Provides WebSocket connections for:
 
 import json
 import asyncio
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Optional, Set
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect, Depends, status
 from fastapi.routing import APIRouter
@@ -20,10 +20,93 @@ from app.core.logging_simple import get_logger
 
 logger = get_logger(__name__)
 
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+    logger.warning("msgpack not available. WebSocket binary frames disabled")
+
+# Sub-protocol clients can request to receive MessagePack binary frames
+MSGPACK_SUBPROTOCOL = "msgpack"
+
 # WebSocket router
 router = APIRouter(prefix="/ws", tags=["websockets"])
 
 
+def negotiate_subprotocol(websocket: WebSocket) -> Optional[str]:
+    """Pick the WebSocket sub-protocol offered by the client, if supported"""
+    if not MSGPACK_AVAILABLE:
+        return None
+    
+    requested = websocket.headers.get("sec-websocket-protocol", "")
+    offered = {protocol.strip() for protocol in requested.split(",")}
+    return MSGPACK_SUBPROTOCOL if MSGPACK_SUBPROTOCOL in offered else None
+
+
+class EncodedMessage:
+    """
+    Message encoded lazily for each frame format.
+    
+    Fan-out paths encode a payload at most once per format, no matter
+    how many connections receive it.
+    """
+    
+    __slots__ = ("message", "_text", "_binary")
+    
+    def __init__(self, message: Dict, text: Optional[str] = None):
+        self.message = message
+        self._text = text
+        self._binary: Optional[bytes] = None
+    
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = json.dumps(self.message)
+        return self._text
+    
+    @property
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = msgpack.packb(self.message)
+        return self._binary
+
+
+class MessageSchema:
+    """
+    Precompiled encoder for a fixed-shape message type.
+    
+    The JSON text is rendered from a template built once at import time,
+    so only the variable fields go through json.dumps. The output is
+    identical to json.dumps of the equivalent dict.
+    """
+    
+    __slots__ = ("message_type", "fields", "_template")
+    
+    def __init__(self, message_type: str, *fields: str):
+        self.message_type = message_type
+        self.fields = fields
+        
+        # Constant parts are %-escaped; each field leaves a %s slot
+        members = [f'"type": {json.dumps(message_type)}'.replace("%", "%%")]
+        members.extend(f'{json.dumps(field).replace("%", "%%")}: %s' for field in fields)
+        self._template = "{" + ", ".join(members) + "}"
+    
+    def encode(self, *values: Any) -> EncodedMessage:
+        """Encode field values, given in schema order"""
+        message = {"type": self.message_type, **dict(zip(self.fields, values))}
+        text = self._template % tuple(map(json.dumps, values))
+        return EncodedMessage(message, text)
+
+
+SCAN_PROGRESS = MessageSchema("scan_progress", "progress", "message", "timestamp", "scan_id")
+SCAN_STATUS_CHANGE = MessageSchema("scan_status_change", "status", "message", "timestamp", "scan_id")
+SCAN_COMPLETED = MessageSchema(
+    "scan_completed", "vulnerability_count", "duration_seconds", "message", "timestamp", "scan_id"
+)
+
+
 class ConnectionManager:
     """
     Manages WebSocket connections and message broadcasting.
@@ -41,18 +124,35 @@ class ConnectionManager:
         
         # User scan subscriptions: user_id -> set of scan_ids
         self.user_subscriptions: Dict[str, Set[str]] = {}
+        
+        # Scan fan-out index: scan_id -> set of subscribed websockets
+        self.scan_websockets: Dict[str, Set[WebSocket]] = {}
+        
+        # Owner of each websocket, used to clean up failed fan-out sends
+        self.websocket_users: Dict[WebSocket, str] = {}
+        
+        # Connections that negotiated MessagePack binary frames
+        self.msgpack_websockets: Set[WebSocket] = set()
     
     async def connect(self, websocket: WebSocket, user_id: str):
         """Accept WebSocket connection and register user"""
-        await websocket.accept()
+        subprotocol = negotiate_subprotocol(websocket)
+        await websocket.accept(subprotocol=subprotocol)
+        
+        if subprotocol == MSGPACK_SUBPROTOCOL:
+            self.msgpack_websockets.add(websocket)
         
         if user_id not in self.active_connections:
             self.active_connections[user_id] = []
         
         self.active_connections[user_id].append(websocket)
-        self.user_subscriptions.setdefault(user_id, set())
+        self.websocket_users[websocket] = user_id
+        
+        # Extend existing scan subscriptions to the new connection
+        for scan_id in self.user_subscriptions.setdefault(user_id, set()):
+            self.scan_websockets.setdefault(scan_id, set()).add(websocket)
         
-        logger.info(f"WebSocket connected for user {user_id}")
+        logger.info("WebSocket connected for user %s", user_id)
         
         # Send welcome message
         await self.send_personal_message(user_id, {
@@ -66,6 +166,11 @@ class ConnectionManager:
         if user_id in self.active_connections:
             try:
                 self.active_connections[user_id].remove(websocket)
+                self.websocket_users.pop(websocket, None)
+                self.msgpack_websockets.discard(websocket)
+                
+                for scan_id in self.user_subscriptions.get(user_id, ()):
+                    self._discard_scan_websocket(scan_id, websocket)
                 
                 # Remove user if no more connections
                 if not self.active_connections[user_id]:
@@ -84,20 +189,36 @@ class ConnectionManager:
             except ValueError:
                 pass
         
-        logger.info(f"WebSocket disconnected for user {user_id}")
+        logger.info("WebSocket disconnected for user %s", user_id)
+    
+    async def send(self, websocket: WebSocket, message: Any):
+        """Send a message or EncodedMessage in the connection's frame format"""
+        if not isinstance(message, EncodedMessage):
+            message = EncodedMessage(message)
+        
+        if websocket in self.msgpack_websockets:
+            await websocket.send_bytes(message.binary)
+        else:
+            await websocket.send_text(message.text)
+    
+    async def receive(self, websocket: WebSocket) -> Dict:
+        """Receive and decode a client message in the connection's frame format"""
+        if websocket in self.msgpack_websockets:
+            return msgpack.unpackb(await websocket.receive_bytes())
+        return json.loads(await websocket.receive_text())
     
     async def send_personal_message(self, user_id: str, message: Dict):
         """Send message to all connections of a specific user"""
         if user_id in self.active_connections:
-            message_text = json.dumps(message)
+            encoded = EncodedMessage(message)
             
             # Send to all user connections
             disconnected_websockets = []
             for websocket in self.active_connections[user_id]:
                 try:
-                    await websocket.send_text(message_text)
+                    await self.send(websocket, encoded)
                 except Exception as e:
-                    logger.warning(f"Failed to send message to user {user_id}: {str(e)}")
+                    logger.warning("Failed to send message to user %s: %s", user_id, e)
                     disconnected_websockets.append(websocket)
             
             # Clean up failed connections
@@ -105,25 +226,47 @@ class ConnectionManager:
                 self.disconnect(websocket, user_id)
     
     async def send_scan_update(self, scan_id: str, message: Dict):
-        """Send scan update to all subscribed users"""
-        if scan_id in self.scan_subscriptions:
-            for user_id in self.scan_subscriptions[scan_id]:
-                await self.send_personal_message(user_id, {
-                    **message,
-                    "scan_id": scan_id
-                })
+        """Send scan update to all subscribed connections"""
+        if scan_id in self.scan_websockets:
+            await self.send_encoded_scan_update(scan_id, EncodedMessage({**message, "scan_id": scan_id}))
+    
+    async def send_encoded_scan_update(self, scan_id: str, encoded: EncodedMessage):
+        """Send an already encoded scan update to all subscribed connections"""
+        websockets = self.scan_websockets.get(scan_id)
+        if not websockets:
+            return
+        
+        # Snapshot the set: failed sends mutate it through disconnect()
+        targets = list(websockets)
+        results = await asyncio.gather(
+            *(self.send(websocket, encoded) for websocket in targets),
+            return_exceptions=True
+        )
+        
+        # Clean up failed connections
+        for websocket, result in zip(targets, results):
+            if isinstance(result, Exception):
+                user_id = self.websocket_users.get(websocket)
+                logger.warning("Failed to send scan update to user %s: %s", user_id, result)
+                if user_id is not None:
+                    self.disconnect(websocket, user_id)
+                else:
+                    self._discard_scan_websocket(scan_id, websocket)
     
     async def broadcast_message(self, message: Dict):
         """Broadcast message to all connected users"""
-        message_text = json.dumps(message)
+        if not self.active_connections:
+            return
+        
+        encoded = EncodedMessage(message)
         
         disconnected_users = []
-        for user_id, websockets in self.active_connections.items():
+        for user_id, websockets in list(self.active_connections.items()):
             disconnected_websockets = []
             
             for websocket in websockets:
                 try:
-                    await websocket.send_text(message_text)
+                    await self.send(websocket, encoded)
                 except Exception:
                     disconnected_websockets.append(websocket)
             
@@ -143,7 +286,12 @@ class ConnectionManager:
             self.user_subscriptions[user_id] = set()
         self.user_subscriptions[user_id].add(scan_id)
         
-        logger.info(f"User {user_id} subscribed to scan {scan_id}")
+        # Add user connections to the fan-out index
+        self.scan_websockets.setdefault(scan_id, set()).update(
+            self.active_connections.get(user_id, ())
+        )
+        
+        logger.info("User %s subscribed to scan %s", user_id, scan_id)
     
     def unsubscribe_from_scan(self, user_id: str, scan_id: str):
         """Unsubscribe user from scan updates"""
@@ -157,7 +305,19 @@ class ConnectionManager:
         if user_id in self.user_subscriptions:
             self.user_subscriptions[user_id].discard(scan_id)
         
-        logger.info(f"User {user_id} unsubscribed from scan {scan_id}")
+        # Remove user connections from the fan-out index
+        for websocket in self.active_connections.get(user_id, ()):
+            self._discard_scan_websocket(scan_id, websocket)
+        
+        logger.info("User %s unsubscribed from scan %s", user_id, scan_id)
+    
+    def _discard_scan_websocket(self, scan_id: str, websocket: WebSocket):
+        """Remove a websocket from the scan fan-out index"""
+        websockets = self.scan_websockets.get(scan_id)
+        if websockets is not None:
+            websockets.discard(websocket)
+            if not websockets:
+                del self.scan_websockets[scan_id]
     
     def get_connection_stats(self) -> Dict:
         """Get connection statistics"""
@@ -205,18 +365,17 @@ async def websocket_scan_progress(
         while True:
             try:
                 # Wait for messages from client
-                data = await websocket.receive_text()
-                message = json.loads(data)
+                message = await manager.receive(websocket)
                 
                 # Handle different message types
                 message_type = message.get("type")
                 
                 if message_type == "ping":
                     # Respond to ping
-                    await websocket.send_text(json.dumps({
+                    await manager.send(websocket, {
                         "type": "pong",
                         "timestamp": datetime.utcnow().isoformat()
-                    }))
+                    })
                 
                 elif message_type == "request_status":
                     # Client requesting current scan status
@@ -228,19 +387,20 @@ async def websocket_scan_progress(
                     })
                 
                 else:
-                    logger.warning(f"Unknown message type: {message_type}")
+                    logger.warning("Unknown message type: %s", message_type)
                     
-            except json.JSONDecodeError:
-                logger.warning("Received invalid JSON from WebSocket client")
+            except ValueError:
+                # JSONDecodeError and msgpack unpack errors are ValueErrors
+                logger.warning("Received invalid payload from WebSocket client")
             except Exception as e:
-                logger.error(f"Error handling WebSocket message: {str(e)}")
+                logger.error("Error handling WebSocket message: %s", e)
                 break
     
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected for user {user_id}, scan {scan_id}")
+        logger.info("WebSocket disconnected for user %s, scan %s", user_id, scan_id)
     
     except Exception as e:
-        logger.error(f"WebSocket error for user {user_id}, scan {scan_id}: {str(e)}")
+        logger.error("WebSocket error for user %s, scan %s: %s", user_id, scan_id, e)
     
     finally:
         # Clean up
@@ -276,28 +436,28 @@ async def websocket_notifications(
         # Keep connection alive
         while True:
             try:
-                data = await websocket.receive_text()
-                message = json.loads(data)
+                message = await manager.receive(websocket)
                 
                 message_type = message.get("type")
                 
                 if message_type == "ping":
-                    await websocket.send_text(json.dumps({
+                    await manager.send(websocket, {
                         "type": "pong",
                         "timestamp": datetime.utcnow().isoformat()
-                    }))
+                    })
                 
-            except json.JSONDecodeError:
-                logger.warning("Received invalid JSON from WebSocket client")
+            except ValueError:
+                # JSONDecodeError and msgpack unpack errors are ValueErrors
+                logger.warning("Received invalid payload from WebSocket client")
             except Exception as e:
-                logger.error(f"Error handling notification WebSocket message: {str(e)}")
+                logger.error("Error handling notification WebSocket message: %s", e)
                 break
     
     except WebSocketDisconnect:
-        logger.info(f"Notifications WebSocket disconnected for user {user_id}")
+        logger.info("Notifications WebSocket disconnected for user %s", user_id)
     
     except Exception as e:
-        logger.error(f"Notifications WebSocket error for user {user_id}: {str(e)}")
+        logger.error("Notifications WebSocket error for user %s: %s", user_id, e)
     
     finally:
         manager.disconnect(websocket, user_id)
@@ -314,12 +474,10 @@ async def send_scan_progress_update(scan_id: str, progress: float, message: str)
         progress: Progress percentage (0-100)
         message: Progress message
     """
-    await manager.send_scan_update(scan_id, {
-        "type": "scan_progress",
-        "progress": progress,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    if scan_id in manager.scan_websockets:
+        await manager.send_encoded_scan_update(scan_id, SCAN_PROGRESS.encode(
+            progress, message, datetime.utcnow().isoformat(), scan_id
+        ))
 
 
 async def send_scan_status_change(scan_id: str, status: str, message: str = None):
@@ -331,12 +489,13 @@ async def send_scan_status_change(scan_id: str, status: str, message: str = None
         status: New status
         message: Optional status message
     """
-    await manager.send_scan_update(scan_id, {
-        "type": "scan_status_change", 
-        "status": status,
-        "message": message or f"Scan status changed to {status}",
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    if scan_id in manager.scan_websockets:
+        await manager.send_encoded_scan_update(scan_id, SCAN_STATUS_CHANGE.encode(
+            status,
+            message or f"Scan status changed to {status}",
+            datetime.utcnow().isoformat(),
+            scan_id
+        ))
 
 
 async def send_scan_completed(scan_id: str, vulnerability_count: int, duration_seconds: float):
@@ -348,13 +507,14 @@ async def send_scan_completed(scan_id: str, vulnerability_count: int, duration_s
         vulnerability_count: Number of vulnerabilities found
         duration_seconds: Scan duration
     """
-    await manager.send_scan_update(scan_id, {
-        "type": "scan_completed",
-        "vulnerability_count": vulnerability_count,
-        "duration_seconds": duration_seconds,
-        "message": f"Scan completed: {vulnerability_count} vulnerabilities found in {duration_seconds:.1f}s",
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    if scan_id in manager.scan_websockets:
+        await manager.send_encoded_scan_update(scan_id, SCAN_COMPLETED.encode(
+            vulnerability_count,
+            duration_seconds,
+            f"Scan completed: {vulnerability_count} vulnerabilities found in {duration_seconds:.1f}s",
+            datetime.utcnow().isoformat(),
+            scan_id
+        ))
 
 
 async def send_vulnerability_found(scan_id: str, vulnerability: Dict):
@@ -365,6 +525,10 @@ async def send_vulnerability_found(scan_id: str, vulnerability: Dict):
         scan_id: Scan ID
         vulnerability: Vulnerability data
     """
+    # Skip building the message when nobody is listening
+    if scan_id not in manager.scan_websockets:
+        return
+    
     await manager.send_scan_update(scan_id, {
         "type": "vulnerability_found",
         "vulnerability": vulnerability,
@@ -383,6 +547,9 @@ async def send_user_notification(user_id: str, notification_type: str, message:
         message: Notification message
         data: Additional data
     """
+    if user_id not in manager.active_connections:
+        return
+    
     await manager.send_personal_message(user_id, {
         "type": notification_type,
         "message": message,
@@ -399,6 +566,9 @@ async def broadcast_system_notification(message: str, notification_type: str = "
         message: Notification message
         notification_type: Type of notification
     """
+    if not manager.active_connections:
+        return
+    
     await manager.broadcast_message({
         "type": notification_type,
         "message": message,
@@ -2,11 +2,13 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from app.core.config import settings
@@ -22,14 +24,26 @@ logger = logging.getLogger(__name__)
 #     echo=settings.DEBUG,
 # )
 
+# Prepared statements don't survive pgbouncer transaction pooling
+statement_cache_size = 0 if settings.DATABASE_PGBOUNCER else settings.DATABASE_STATEMENT_CACHE_SIZE
+connect_args = {
+    # asyncpg prepared-statement LRU per connection
+    "statement_cache_size": statement_cache_size,
+}
+
 # Create async engine for application use
 async_database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+if "prepared_statement_cache_size" not in async_database_url:
+    separator = "&" if "?" in async_database_url else "?"
+    async_database_url += f"{separator}prepared_statement_cache_size={statement_cache_size}"
+
 async_engine = create_async_engine(
     async_database_url,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_pre_ping=True,
     echo=settings.DEBUG,
+    connect_args=connect_args,
 )
 
 # Session makers - sync session commented out for now
@@ -44,6 +58,30 @@ Base = declarative_base()
 # Metadata for migrations
 metadata = MetaData()
 
+# Indexes that queries rely on but the models do not declare (see scripts/init.sql),
+# keyed by name. Each entry's statements run once, when the index is missing.
+_REQUIRED_INDEXES = {
+    # Target of the ON CONFLICT clause used to insert scan findings
+    "idx_vulnerabilities_scan_finding": (
+        # The unique index cannot be built while duplicate findings exist; keep the first of each
+        text(
+            "DELETE FROM vulnerabilities a USING vulnerabilities b "
+            "WHERE a.scan_id = b.scan_id AND a.vulnerability_id = b.vulnerability_id "
+            "AND a.affected_url = b.affected_url "
+            "AND COALESCE(a.affected_parameter, '') = COALESCE(b.affected_parameter, '') "
+            "AND a.ctid > b.ctid"
+        ),
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_vulnerabilities_scan_finding ON vulnerabilities"
+            "(scan_id, vulnerability_id, affected_url, (COALESCE(affected_parameter, '')))"
+        ),
+    ),
+    # Newest-first report listing per scan
+    "idx_reports_scan_id_created_at": (
+        text("CREATE INDEX IF NOT EXISTS idx_reports_scan_id_created_at ON reports(scan_id, created_at DESC)"),
+    ),
+}
+
 
 # def get_db() -> Session:
 #     """Dependency to get database session (sync)"""
@@ -87,6 +125,9 @@ async def create_tables():
             # Create all tables
             await conn.run_sync(Base.metadata.create_all)
             
+            # Add the indexes create_all doesn't know about, on new and existing databases
+            await create_required_indexes(conn)
+            
         logger.info("✅ Database tables created successfully")
         
     except Exception as e:
@@ -94,6 +135,39 @@ async def create_tables():
         raise
 
 
+async def create_required_indexes(conn):
+    """Create any missing index from _REQUIRED_INDEXES on an open connection"""
+    result = await conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()")
+    )
+    existing = set(result.scalars())
+    
+    for name, statements in _REQUIRED_INDEXES.items():
+        if name in existing:
+            continue
+        for statement in statements:
+            await conn.execute(statement)
+        logger.info(f"✅ Created index {name}")
+
+
+async def warm_pool():
+    """Open the pool's connections concurrently so first requests find them ready"""
+    if isinstance(async_engine.pool, NullPool):
+        logger.info("Database pool is a NullPool, skipping warm-up")
+        return
+    
+    async def _ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    try:
+        await asyncio.gather(*(_ping() for _ in range(settings.DATABASE_POOL_SIZE)))
+        logger.info(f"✅ Database pool warmed with {settings.DATABASE_POOL_SIZE} connections")
+        
+    except Exception as e:
+        logger.warning(f"Database pool warm-up failed: {str(e)}")
+
+
 async def drop_tables():
     """Drop all database tables (for testing)"""
     try:
@@ -115,29 +189,11 @@ class DatabaseManager:
         """Check database connectivity"""
         try:
             async with get_db_session() as session:
-                await session.execute("SELECT 1")
+                await session.execute(text("SELECT 1"))
                 return True
         except Exception as e:
             logger.error(f"Database health check failed: {str(e)}")
             return False
-    
-    @staticmethod
-    async def get_db_info():
-        """Get database information"""
-        try:
-            async with get_db_session() as session:
-                result = await session.execute("""
-                    SELECT 
-                        version() as version,
-                        current_database() as database,
-                        current_user as user,
-                        inet_server_addr() as host,
-                        inet_server_port() as port
-                """)
-                return dict(result.fetchone()._mapping)
-        except Exception as e:
-            logger.error(f"Error getting database info: {str(e)}")
-            return None
 
 
 # Export database manager instance
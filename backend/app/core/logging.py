@@ -1,22 +1,34 @@
 """
 Logging configuration for ScanIA
+
+Full dictConfig-based setup with rotating files. app.main currently configures
+logging through app.core.logging_simple instead, so this module only takes
+effect where setup_logging() below is called explicitly.
 """
 
+import atexit
 import logging
 import logging.config
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Dict, Any
 
 from app.core.config import settings
 
 
+# Create logs directory once, at import (the security handler below needs it too)
+LOGS_DIR = Path("logs")
+LOGS_DIR.mkdir(exist_ok=True)
+
+
 def setup_logging():
-    """Setup application logging configuration"""
+    """Setup application logging configuration (idempotent per process)"""
     
-    # Create logs directory
-    logs_dir = Path("logs")
-    logs_dir.mkdir(exist_ok=True)
+    # dictConfig must run once; a second run would re-open every file handler
+    if getattr(setup_logging, "_done", False):
+        return
     
     # Logging configuration
     config: Dict[str, Any] = {
@@ -87,6 +99,7 @@ def setup_logging():
                 "propagate": False,
             },
         },
+        # Named loggers above don't propagate, so only other (library) loggers reach root
         "root": {
             "level": settings.LOG_LEVEL,
             "handlers": ["console", "file"],
@@ -96,6 +109,9 @@ def setup_logging():
     # Apply configuration
     logging.config.dictConfig(config)
     
+    # Keep file/stream I/O off the event loop thread
+    _install_queue_handlers(config["loggers"].keys())
+    
     # Set specific logger levels based on environment
     if settings.ENVIRONMENT == "development":
         logging.getLogger("app").setLevel(logging.DEBUG)
@@ -104,11 +120,41 @@ def setup_logging():
         logging.getLogger("app").setLevel(logging.WARNING)
         logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     
+    setup_logging._done = True
+    
     # Get logger for this module
     logger = logging.getLogger(__name__)
     logger.info(f"Logging configured for environment: {settings.ENVIRONMENT}")
 
 
+def _install_queue_handlers(logger_names):
+    """
+    Replace the configured handlers with QueueHandlers.
+    
+    Each real handler gets its own queue and background QueueListener, so
+    per-logger routing and handler levels are preserved while logging calls
+    only enqueue the record.
+    """
+    queue_handlers: Dict[logging.Handler, QueueHandler] = {}
+    loggers = [logging.getLogger(name) for name in logger_names]
+    loggers.append(logging.getLogger())
+    
+    for logger in loggers:
+        for index, handler in enumerate(logger.handlers):
+            queue_handler = queue_handlers.get(handler)
+            if queue_handler is None:
+                log_queue = queue.SimpleQueue()
+                queue_handler = QueueHandler(log_queue)
+                queue_handler.setLevel(handler.level)
+                queue_handlers[handler] = queue_handler
+                
+                listener = QueueListener(log_queue, handler, respect_handler_level=True)
+                listener.start()
+                atexit.register(listener.stop)
+            
+            logger.handlers[index] = queue_handler
+
+
 class LoggerMixin:
     """Mixin to add logger to classes"""
     
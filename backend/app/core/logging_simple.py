@@ -2,11 +2,18 @@
 Simplified logging configuration for development
 """
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
 def setup_logging():
-    """Setup basic logging"""
+    """Setup basic logging (idempotent per process)"""
+    # A second run would add another root handler and listener, duplicating every line
+    if getattr(setup_logging, "_done", False):
+        return logging.getLogger('app')
+    
     # Create console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
@@ -17,15 +24,22 @@ def setup_logging():
     )
     console_handler.setFormatter(formatter)
     
-    # Setup root logger
+    # Setup root logger; records are queued and written by a background
+    # thread so request handlers never block on stdout
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(QueueHandler(log_queue))
     
     # Setup app logger
     app_logger = logging.getLogger('app')
     app_logger.setLevel(logging.INFO)
     
+    setup_logging._done = True
     return app_logger
 
 def get_logger(name: str):
@@ -33,7 +47,13 @@ def get_logger(name: str):
     return logging.getLogger(name)
 
 class SecurityLogger:
-    """Simple security logger"""
+    """
+    Simple security logger.
+    
+    Each event is its own record, with its own timestamp and level. Records
+    propagate to the root QueueHandler installed by setup_logging, so the
+    write itself happens on the listener thread, off the request path.
+    """
     
     def __init__(self):
         self.logger = logging.getLogger('security')
@@ -2,165 +2,307 @@
 Security utilities for authentication and authorization
 """
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional, Dict, Any
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+import jwt
+from jwt import api_jws
 from fastapi import HTTPException, status
+from cachetools import TTLCache
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+import bcrypt
 import secrets
 import hashlib
+import hmac
+import json
 import logging
+import re
+import string
+import threading
+import time
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def _load_jwt_keys():
+    """Return (signing key, verification key) for the configured JWT algorithm"""
+    if settings.JWT_ALGORITHM != "EdDSA":
+        return settings.JWT_SECRET_KEY, settings.JWT_SECRET_KEY
+    
+    if not settings.JWT_PRIVATE_KEY or not settings.JWT_PUBLIC_KEY:
+        raise ValueError("JWT_PRIVATE_KEY and JWT_PUBLIC_KEY must be set for EdDSA")
+    
+    # Parse the PEMs once instead of on every encode/decode
+    private_pem = settings.JWT_PRIVATE_KEY.replace("\\n", "\n").encode()
+    public_pem = settings.JWT_PUBLIC_KEY.replace("\\n", "\n").encode()
+    return load_pem_private_key(private_pem, password=None), load_pem_public_key(public_pem)
+
 
+# Token settings are fixed for the process lifetime; bind them once
+_jwt_signing_key, _jwt_verify_key = _load_jwt_keys()
+_jwt_headers = {"kid": settings.JWT_KEY_ID} if settings.JWT_KEY_ID else None
+_jwt_algorithm = settings.JWT_ALGORITHM
+_jwt_algorithms = [_jwt_algorithm]
+_jwt_default_expire_seconds = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
 
-class SecurityManager:
-    """Centralized security management"""
+def _compile_claims_encoder(claim_names: tuple):
+    """
+    Build a JSON encoder specialized for a fixed claim set.
     
-    @staticmethod
-    def hash_password(password: str) -> str:
-        """Hash a password using bcrypt"""
-        return pwd_context.hash(password)
+    The template is built once; only claim values go through json.dumps.
+    Output matches PyJWT's compact json.dumps of the same dict.
+    """
+    template = "{" + ",".join(f'{json.dumps(name).replace("%", "%%")}:%s' for name in claim_names) + "}"
     
-    @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
-        return pwd_context.verify(plain_password, hashed_password)
+    def encode(claims: Dict[str, Any]) -> bytes:
+        return (template % tuple(json.dumps(claims[name]) for name in claim_names)).encode()
     
-    @staticmethod
-    def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
-        """Create JWT access token"""
-        to_encode = data.copy()
-        
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            expire = datetime.utcnow() + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
-        
-        to_encode.update({"exp": expire, "iat": datetime.utcnow()})
-        
-        encoded_jwt = jwt.encode(
-            to_encode, 
-            settings.JWT_SECRET_KEY, 
-            algorithm=settings.JWT_ALGORITHM
+    return encode
+
+
+# Claims issued for every login session (see AuthService.create_session)
+_SESSION_CLAIMS = ("sub", "email", "role", "session_id", "exp", "iat")
+_SESSION_CLAIM_SET = frozenset(_SESSION_CLAIMS)
+_encode_session_claims = _compile_claims_encoder(_SESSION_CLAIMS)
+
+# Decoded JWT payloads keyed by token digest. The short TTL bounds how long
+# a cached token can skip signature verification.
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+_token_cache_lock = threading.Lock()
+
+
+# Password character classes, as bits of a mask
+_UPPER, _LOWER, _DIGIT, _SPECIAL = 1, 2, 4, 8
+_ALL_CLASSES = _UPPER | _LOWER | _DIGIT | _SPECIAL
+_SPECIAL_CHARS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+_CHAR_CLASS = {
+    **dict.fromkeys(string.ascii_uppercase, _UPPER),
+    **dict.fromkeys(string.ascii_lowercase, _LOWER),
+    **dict.fromkeys(string.digits, _DIGIT),
+    **dict.fromkeys(_SPECIAL_CHARS, _SPECIAL),
+}
+
+
+def _password_char_classes(password: str) -> int:
+    """Character-class mask of a password, in a single early-exit pass"""
+    mask = 0
+    for c in password:
+        bit = _CHAR_CLASS.get(c)
+        if bit is None:
+            # Non-ASCII characters keep the str.isupper()/islower()/isdigit() semantics
+            bit = _UPPER if c.isupper() else _LOWER if c.islower() else _DIGIT if c.isdigit() else 0
+        mask |= bit
+        if mask == _ALL_CLASSES:
+            break
+    return mask
+
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+# Successful bcrypt verifications keyed by (hash, HMAC(hash, password)).
+# Failures are never cached so wrong guesses always pay the full bcrypt cost.
+_password_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+_password_cache_lock = threading.Lock()
+
+
+def _password_cache_key(plain_password: str, hashed_password: str) -> tuple:
+    digest = hmac.new(hashed_password.encode(), plain_password.encode(), hashlib.sha256).digest()
+    return hashed_password, digest
+
+
+def hash_password(password: str) -> str:
+    """Hash a password using bcrypt"""
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash"""
+    cache_key = _password_cache_key(plain_password, hashed_password)
+    with _password_cache_lock:
+        if cache_key in _password_cache:
+            return True
+    
+    if not bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8")):
+        return False
+    
+    with _password_cache_lock:
+        _password_cache[cache_key] = True
+    return True
+
+
+def invalidate_password_hash(hashed_password: str) -> None:
+    """Drop cached verifications for a hash (e.g. after a password change)"""
+    with _password_cache_lock:
+        for cache_key in [key for key in _password_cache.keys() if key[0] == hashed_password]:
+            _password_cache.pop(cache_key, None)
+
+
+def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    """Create JWT access token"""
+    to_encode = data.copy()
+    
+    # Claims are POSIX timestamps (RFC 7519 NumericDate), no datetime round-trip
+    now = int(time.time())
+    if expires_delta:
+        expire = now + int(expires_delta.total_seconds())
+    else:
+        expire = now + _jwt_default_expire_seconds
+    
+    to_encode.update({"exp": expire, "iat": now})
+    
+    if to_encode.keys() == _SESSION_CLAIM_SET:
+        # Known claim set: sign pre-serialized bytes, skipping the generic encoder
+        return api_jws.encode(
+            _encode_session_claims(to_encode),
+            _jwt_signing_key,
+            algorithm=_jwt_algorithm,
+            headers=_jwt_headers
         )
-        
-        return encoded_jwt
-    
-    @staticmethod
-    def verify_token(token: str) -> Dict[str, Any]:
-        """Verify and decode JWT token"""
-        try:
-            payload = jwt.decode(
-                token, 
-                settings.JWT_SECRET_KEY, 
-                algorithms=[settings.JWT_ALGORITHM]
-            )
-            
-            # Check if token is expired
-            exp = payload.get("exp")
-            if exp is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token missing expiration",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            
-            if datetime.utcnow() > datetime.fromtimestamp(exp):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token expired",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            
-            return payload
-            
-        except JWTError as e:
-            logger.warning(f"JWT verification failed: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    
-    @staticmethod
-    def generate_reset_token() -> str:
-        """Generate secure reset token"""
-        return secrets.token_urlsafe(32)
-    
-    @staticmethod
-    def generate_api_key() -> str:
-        """Generate API key"""
-        return f"sia_{secrets.token_urlsafe(32)}"
-    
-    @staticmethod
-    def hash_api_key(api_key: str) -> str:
-        """Hash API key for storage"""
-        return hashlib.sha256(api_key.encode()).hexdigest()
-    
-    @staticmethod
-    def verify_api_key(api_key: str, api_key_hash: str) -> bool:
-        """Verify API key against hash"""
-        return hashlib.sha256(api_key.encode()).hexdigest() == api_key_hash
-    
-    @staticmethod
-    def is_strong_password(password: str) -> tuple[bool, str]:
-        """Check if password meets security requirements"""
-        if len(password) < 8:
-            return False, "Password must be at least 8 characters long"
-        
-        if not any(c.isupper() for c in password):
-            return False, "Password must contain at least one uppercase letter"
-        
-        if not any(c.islower() for c in password):
-            return False, "Password must contain at least one lowercase letter"
-        
-        if not any(c.isdigit() for c in password):
-            return False, "Password must contain at least one digit"
-        
-        special_chars = "!@#$%^&*()_+-=[]{}|;:,.<>?"
-        if not any(c in special_chars for c in password):
-            return False, "Password must contain at least one special character"
-        
-        return True, "Password is strong"
     
-    @staticmethod
-    def sanitize_input(input_string: str) -> str:
-        """Basic input sanitization"""
-        if not input_string:
-            return ""
+    encoded_jwt = jwt.encode(
+        to_encode, 
+        _jwt_signing_key, 
+        algorithm=_jwt_algorithm,
+        headers=_jwt_headers
+    )
+    
+    return encoded_jwt
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """Verify and decode JWT token"""
+    cache_key = _token_cache_key(token)
+    with _token_cache_lock:
+        payload = _token_cache.get(cache_key)
+    
+    # Callers get their own copy, so one mutating its payload can't affect the cache
+    if payload is not None and payload["exp"] > time.time():
+        return dict(payload)
+    
+    try:
+        # PyJWT validates exp itself; requiring it rejects tokens without one
+        payload = jwt.decode(
+            token, 
+            _jwt_verify_key, 
+            algorithms=_jwt_algorithms,
+            options={"require": ["exp"], "verify_exp": True}
+        )
         
-        # Remove null bytes
-        sanitized = input_string.replace('\x00', '')
+        with _token_cache_lock:
+            _token_cache[cache_key] = payload
         
-        # Strip whitespace
-        sanitized = sanitized.strip()
+        return dict(payload)
         
-        return sanitized
+    except jwt.MissingRequiredClaimError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token missing expiration",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token expired",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    except jwt.PyJWTError as e:
+        logger.warning(f"JWT verification failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def invalidate_token(token: str) -> None:
+    """Drop a token from the verification cache (e.g. on logout)"""
+    with _token_cache_lock:
+        _token_cache.pop(_token_cache_key(token), None)
+
+
+def generate_reset_token() -> str:
+    """Generate secure reset token"""
+    return secrets.token_urlsafe(32)
+
+
+def generate_api_key() -> str:
+    """Generate API key"""
+    return f"sia_{secrets.token_urlsafe(32)}"
+
+
+def hash_api_key(api_key: str) -> str:
+    """Hash API key for storage"""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def verify_api_key(api_key: str, api_key_hash: str) -> bool:
+    """Verify API key against hash (constant-time)"""
+    try:
+        expected = bytes.fromhex(api_key_hash)
+    except (TypeError, ValueError):
+        return False
+    return hmac.compare_digest(hashlib.sha256(api_key.encode()).digest(), expected)
+
+
+def is_strong_password(password: str) -> tuple[bool, str]:
+    """Check if password meets security requirements"""
+    if len(password) < 8:
+        return False, "Password must be at least 8 characters long"
+    
+    mask = _password_char_classes(password)
+    
+    if not mask & _UPPER:
+        return False, "Password must contain at least one uppercase letter"
+    
+    if not mask & _LOWER:
+        return False, "Password must contain at least one lowercase letter"
+    
+    if not mask & _DIGIT:
+        return False, "Password must contain at least one digit"
+    
+    if not mask & _SPECIAL:
+        return False, "Password must contain at least one special character"
+    
+    return True, "Password is strong"
+
+
+def sanitize_input(input_string: str) -> str:
+    """Basic input sanitization"""
+    if not input_string:
+        return ""
     
-    @staticmethod
-    def validate_email(email: str) -> bool:
-        """Basic email validation"""
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+    # Remove null bytes
+    sanitized = input_string.replace('\x00', '')
     
-    @staticmethod
-    def generate_session_id() -> str:
-        """Generate secure session ID"""
-        return secrets.token_urlsafe(32)
+    # Strip whitespace
+    sanitized = sanitized.strip()
     
-    @staticmethod
-    def check_rate_limit(identifier: str, limit: int, window: int) -> bool:
-        """Check rate limiting (placeholder for Redis implementation)"""
-        # This would be implemented with Redis in a real application
-        # For now, always return True (no rate limiting)
-        return True
+    return sanitized
+
+
+def validate_email(email: str) -> bool:
+    """Basic email validation"""
+    return bool(_EMAIL_RE.match(email))
+
+
+def generate_session_id() -> str:
+    """Generate secure session ID"""
+    return secrets.token_urlsafe(32)
+
+
+def check_rate_limit(identifier: str, limit: int, window: int) -> bool:
+    """Check rate limiting (placeholder for Redis implementation)"""
+    # This would be implemented with Redis in a real application
+    # For now, always return True (no rate limiting)
+    return True
 
 
 class PasswordValidator:
@@ -183,10 +325,11 @@ class PasswordValidator:
             score += 1
         
         # Check character types
-        has_upper = any(c.isupper() for c in password)
-        has_lower = any(c.islower() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_special = any(c in "!@#$%^&*()_+-=[]{}|;:,.<>?" for c in password)
+        mask = _password_char_classes(password)
+        has_upper = bool(mask & _UPPER)
+        has_lower = bool(mask & _LOWER)
+        has_digit = bool(mask & _DIGIT)
+        has_special = bool(mask & _SPECIAL)
         
         if has_upper:
             score += 1
@@ -222,7 +365,3 @@ class PasswordValidator:
             "strength": strength,
             "score": score
         }
-
-
-# Export security manager instance
-security = SecurityManager()
\ No newline at end of file
@@ -6,17 +6,18 @@ FastAPI Main Application
 from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
-import time
 
 from app.core.config import settings
 from app.core.logging_simple import setup_logging
 from app.api.v1.router import api_router
 from app.middleware.security import SecurityMiddleware
 from app.middleware.metrics import PrometheusMiddleware
-from app.core.database import create_tables
+from app.middleware.timing import ProcessTimeMiddleware
+from app.core.database import create_tables, warm_pool
+from app.services.report_service import shutdown_report_pool
 
 
 # Setup logging
@@ -34,6 +35,9 @@ async def lifespan(app: FastAPI):
     await create_tables()
     logger.info("✅ Database tables created/verified")
     
+    # Open pooled connections ahead of the first requests
+    await warm_pool()
+    
     # Initialize services
     logger.info("✅ ScanIA backend started successfully")
     
@@ -41,6 +45,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("📴 Shutting down ScanIA backend...")
+    
+    # Stop report build worker processes
+    shutdown_report_pool()
 
 
 # Create FastAPI application
@@ -50,7 +57,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.ENVIRONMENT == "development" else None,
     redoc_url="/redoc" if settings.ENVIRONMENT == "development" else None,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware (must be first for proper handling)
@@ -75,14 +83,8 @@ app.add_middleware(SecurityMiddleware)
 if settings.PROMETHEUS_ENABLED:
     app.add_middleware(PrometheusMiddleware)
 
-# Request timing middleware
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+# Request timing middleware (added last, so it is outermost and times the others)
+app.add_middleware(ProcessTimeMiddleware)
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
@@ -6,10 +6,16 @@ from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 import time
 import logging
-from typing import Callable
+import re
+from typing import Callable, Dict, Tuple
 
 logger = logging.getLogger(__name__)
 
+# UUID or numeric path segments, normalized to a placeholder in one pass
+_PATH_NORMALIZE = re.compile(
+    r'/(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+)'
+)
+
 try:
     from prometheus_client import Counter, Histogram, Gauge
     
@@ -40,6 +46,10 @@ except ImportError:
     REQUEST_DURATION = None
     ACTIVE_REQUESTS = None
 
+# Labelled metric children by (method, endpoint, status_code); the set of
+# combinations is small and stabilizes quickly
+_LABEL_CACHE: Dict[Tuple[str, str, int], tuple] = {}
+
 
 class PrometheusMiddleware(BaseHTTPMiddleware):
     """Middleware to collect Prometheus metrics"""
@@ -52,28 +62,29 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
         ACTIVE_REQUESTS.inc()
         
         # Record start time
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             # Process request
             response = await call_next(request)
             
             # Record metrics
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             method = request.method
             endpoint = self._get_endpoint(request)
             status_code = response.status_code
             
-            REQUEST_COUNT.labels(
-                method=method,
-                endpoint=endpoint,
-                status_code=status_code
-            ).inc()
+            key = (method, endpoint, status_code)
+            children = _LABEL_CACHE.get(key)
+            if children is None:
+                children = (
+                    REQUEST_COUNT.labels(method=method, endpoint=endpoint, status_code=status_code),
+                    REQUEST_DURATION.labels(method=method, endpoint=endpoint)
+                )
+                _LABEL_CACHE[key] = children
             
-            REQUEST_DURATION.labels(
-                method=method,
-                endpoint=endpoint
-            ).observe(duration)
+            children[0].inc()
+            children[1].observe(duration)
             
             return response
             
@@ -83,20 +94,5 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
     
     def _get_endpoint(self, request: Request) -> str:
         """Extract endpoint pattern from request"""
-        # Simple endpoint extraction
-        path = request.url.path
-        
         # Replace UUIDs and numbers with placeholders
-        import re
-        
-        # Replace UUIDs
-        path = re.sub(
-            r'/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',
-            '/{id}',
-            path
-        )
-        
-        # Replace numbers
-        path = re.sub(r'/\d+', '/{id}', path)
-        
-        return path or "/"
\ No newline at end of file
+        return _PATH_NORMALIZE.sub('/{id}', request.url.path) or "/"
\ No newline at end of file
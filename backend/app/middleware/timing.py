@@ -0,0 +1,37 @@
+"""
+Request timing middleware for ScanIA
+"""
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class ProcessTimeMiddleware:
+    """
+    Add an X-Process-Time header with the total time spent handling a request.
+    
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so it adds no
+    call_next task or response wrapping. Registered last in app.main, it is the
+    outermost layer and times every other middleware, including responses they
+    return early (e.g. blocked requests).
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.time()
+        
+        async def send_with_process_time(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", str(time.time() - start_time))
+            await send(message)
+        
+        await self.app(scope, receive, send_with_process_time)
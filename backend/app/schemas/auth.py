@@ -57,9 +57,6 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
         use_enum_values = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None
-        }
 
 
 class LoginResponse(BaseModel):
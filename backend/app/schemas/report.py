@@ -3,7 +3,7 @@ Report schemas for request/response validation
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 from app.models.report import ReportFormat, ReportStatus
@@ -14,11 +14,6 @@ class ReportCreateRequest(BaseModel):
     scan_id: str = Field(..., description="ID do scan para gerar relatório")
     format: ReportFormat = Field(default=ReportFormat.PDF, description="Formato do relatório")
     report_type: str = Field(default="executive", description="Tipo de relatório (executive, technical)")
-    
-    class Config:
-        json_encoders = {
-            ReportFormat: lambda v: v.value
-        }
 
 
 class ReportResponse(BaseModel):
@@ -36,10 +31,6 @@ class ReportResponse(BaseModel):
     
     class Config:
         from_attributes = True
-        json_encoders = {
-            ReportFormat: lambda v: v.value,
-            ReportStatus: lambda v: v.value
-        }
 
 
 class ReportListResponse(BaseModel):
@@ -50,6 +41,37 @@ class ReportListResponse(BaseModel):
     per_page: int = Field(..., description="Itens por página")
     has_next: bool = Field(..., description="Tem próxima página")
     has_prev: bool = Field(..., description="Tem página anterior")
+    
+    @classmethod
+    def columns(cls, reports: List[Any], total: int, page: int, per_page: int) -> Dict[str, Any]:
+        """
+        Column-oriented payload for bulk listings.
+        
+        "reports" maps each ReportResponse field to a list of values, built
+        straight from the ORM rows without per-row model construction.
+        """
+        return {
+            "reports": {
+                "id": [str(report.id) for report in reports],
+                "scan_id": [str(report.scan_id) for report in reports],
+                "format": [report.format for report in reports],
+                "status": [report.status for report in reports],
+                "title": [report.title for report in reports],
+                "description": [report.description for report in reports],
+                "file_size": [report.file_size for report in reports],
+                "created_at": [report.created_at for report in reports],
+                "generated_at": [report.generated_at for report in reports],
+                "download_url": [
+                    f"/api/v1/reports/{report.id}/download" if report.status == ReportStatus.COMPLETED else None
+                    for report in reports
+                ],
+            },
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "has_next": (page * per_page) < total,
+            "has_prev": page > 1
+        }
 
 
 class ReportStatusResponse(BaseModel):
@@ -60,11 +82,6 @@ class ReportStatusResponse(BaseModel):
     message: str = Field(..., description="Mensagem de status")
     file_size: Optional[int] = Field(None, description="Tamanho do arquivo em bytes")
     generated_at: Optional[datetime] = Field(None, description="Data de geração")
-    
-    class Config:
-        json_encoders = {
-            ReportStatus: lambda v: v.value
-        }
 
 
 class ReportStatsResponse(BaseModel):
@@ -117,9 +134,4 @@ REPORT_TEMPLATES = [
 
 class ReportTemplateResponse(BaseModel):
     """Report template list response"""
-    templates: List[ReportTemplate] = Field(..., description="Templates disponíveis")
-    
-    class Config:
-        json_encoders = {
-            ReportFormat: lambda v: v.value
-        }
\ No newline at end of file
+    templates: List[ReportTemplate] = Field(..., description="Templates disponíveis")
\ No newline at end of file
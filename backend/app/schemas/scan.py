@@ -77,6 +77,41 @@ class ScanListResponse(BaseModel):
     per_page: int
     has_next: bool
     has_prev: bool
+    
+    @classmethod
+    def columns(cls, scans: List[Any], total: int, page: int, per_page: int) -> Dict[str, Any]:
+        """
+        Column-oriented payload for bulk listings.
+        
+        "scans" maps each ScanResponse field to a list of values, built
+        straight from the ORM rows without per-row model construction.
+        """
+        return {
+            "scans": {
+                "id": [str(scan.id) for scan in scans],
+                "target_url": [scan.target_url for scan in scans],
+                "scan_types": [scan.scan_types for scan in scans],
+                "status": [scan.status for scan in scans],
+                "options": [scan.options for scan in scans],
+                "environment_type": [scan.environment_type for scan in scans],
+                "scan_number": [scan.scan_number for scan in scans],
+                "started_at": [scan.started_at for scan in scans],
+                "completed_at": [scan.completed_at for scan in scans],
+                "duration_seconds": [scan.duration_seconds for scan in scans],
+                "celery_job_id": [scan.celery_job_id for scan in scans],
+                "error_message": [scan.error_message for scan in scans],
+                "created_at": [scan.created_at for scan in scans],
+                "updated_at": [scan.updated_at for scan in scans],
+                "vulnerability_summary": [scan.vulnerability_summary for scan in scans],
+                "total_vulnerabilities": [scan.total_vulnerabilities for scan in scans],
+                "risk_score": [scan.calculate_risk_score() for scan in scans],
+            },
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "has_next": (page * per_page) < total,
+            "has_prev": page > 1
+        }
 
 
 class ScanUpdateRequest(BaseModel):
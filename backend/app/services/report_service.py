@@ -6,28 +6,37 @@ vulnerability details, and executive summaries.
 """
 
 import asyncio
+import heapq
 import logging
+import os
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import json
 import base64
 import io
-import uuid
+from xml.sax.saxutils import escape
 
+from cachetools import TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
 # PDF generation imports
 try:
     from reportlab.lib.pagesizes import A4, letter
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable, Preformatted
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.colors import HexColor, colors
+    from reportlab.lib.colors import HexColor
     from reportlab.lib.units import inch, cm
     from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-    from reportlab.graphics.shapes import Drawing
+    from reportlab.graphics.shapes import Drawing, String
     from reportlab.graphics.charts.piecharts import Pie
     from reportlab.graphics.charts.barcharts import VerticalBarChart
     REPORTLAB_AVAILABLE = True
@@ -36,22 +45,287 @@ except ImportError:
     logging.warning("ReportLab not available. Install reportlab to enable PDF generation")
 
 try:
-    import matplotlib.pyplot as plt
-    import matplotlib.colors as mcolors
-    import seaborn as sns
-    MATPLOTLIB_AVAILABLE = True
+    import numpy as np
+    NUMPY_AVAILABLE = True
 except ImportError:
-    MATPLOTLIB_AVAILABLE = False
-    logging.warning("Matplotlib not available. Install matplotlib for advanced charts")
+    NUMPY_AVAILABLE = False
 
 from app.models.scan import Scan
 from app.models.vulnerability import Vulnerability
 from app.models.report import Report, ReportFormat, ReportStatus
+from app.core.database import get_db_session
 from app.core.logging_simple import get_logger
 
 logger = get_logger(__name__)
 
 
+# Severity levels in report order; a vulnerability's severity is stored as its index here
+SEVERITY_LEVELS = ('critical', 'high', 'medium', 'low', 'info')
+SEV_CRIT, SEV_HIGH, SEV_MED, SEV_LOW, SEV_INFO = range(len(SEVERITY_LEVELS))
+_SEVERITY_INDEX = {severity: index for index, severity in enumerate(SEVERITY_LEVELS)}
+
+# Below this size a Counter beats the cost of building a NumPy array
+_BINCOUNT_MIN_SIZE = 512
+
+
+# Severity palette, shared by paragraph styles and charts
+SEVERITY_HEX = {
+    'critical': '#7f1d1d',
+    'high': '#dc2626',
+    'medium': '#d97706',
+    'low': '#65a30d',
+    'info': '#0891b2'
+}
+DEFAULT_SEVERITY_HEX = '#6b7280'
+
+
+@lru_cache(maxsize=16)
+def _get_severity_color(severity: str) -> "HexColor":
+    """Get color for severity level"""
+    return HexColor(SEVERITY_HEX.get(severity.lower(), DEFAULT_SEVERITY_HEX))
+
+
+@lru_cache(maxsize=256)
+def _risk_level(critical: int, high: int, medium: int, low: int) -> str:
+    """Overall risk level for the given per-severity vulnerability counts"""
+    if critical > 0:
+        return 'Critical'
+    elif high > 2:
+        return 'Critical'
+    elif high > 0:
+        return 'High'
+    elif medium > 5:
+        return 'High'
+    elif medium > 0:
+        return 'Medium'
+    elif low > 10:
+        return 'Medium'
+    elif low > 0:
+        return 'Low'
+    else:
+        return 'Low'
+
+
+# Maps isoformat() output ("2024-01-31T12:00:00") to a filename stamp ("20240131_120000")
+_FILENAME_TIMESTAMP_TABLE = str.maketrans({'-': None, ':': None, 'T': '_'})
+
+
+def _format_datetime(value: datetime) -> str:
+    """Format a datetime as dd/mm/YYYY HH:MM without going through strftime"""
+    return f"{value.day:02d}/{value.month:02d}/{value.year:04d} {value.hour:02d}:{value.minute:02d}"
+
+
+@dataclass(slots=True)
+class VulnerabilitySnapshot:
+    """
+    Column-oriented, ORM-free copy of a scan's vulnerabilities.
+    
+    Built once per report so the section builders iterate plain lists
+    instead of going through SQLAlchemy attribute instrumentation.
+    """
+    titles: List[str] = field(default_factory=list)
+    descriptions: List[str] = field(default_factory=list)
+    solutions: List[Optional[str]] = field(default_factory=list)
+    severities: List[int] = field(default_factory=list)
+    cvss_scores: List[Optional[float]] = field(default_factory=list)
+    urls: List[str] = field(default_factory=list)
+    cve_ids: List[Optional[str]] = field(default_factory=list)
+    parameters: List[Optional[str]] = field(default_factory=list)
+    sort_keys: List[tuple] = field(default_factory=list)
+    
+    @classmethod
+    def from_vulnerabilities(cls, vulnerabilities: List[Vulnerability]) -> "VulnerabilitySnapshot":
+        """Copy the fields used by the reports out of the ORM objects"""
+        snapshot = cls()
+        for vuln in vulnerabilities:
+            cvss_score = vuln.cvss_score
+            snapshot.titles.append(vuln.title)
+            snapshot.descriptions.append(vuln.description)
+            snapshot.solutions.append(vuln.solution)
+            snapshot.severities.append(_SEVERITY_INDEX[vuln.severity.value])
+            snapshot.cvss_scores.append(cvss_score)
+            snapshot.urls.append(vuln.affected_url)
+            snapshot.cve_ids.append(vuln.cve_id)
+            snapshot.parameters.append(vuln.affected_parameter)
+            snapshot.sort_keys.append((vuln.severity_weight, cvss_score or 0))
+        return snapshot
+    
+    def __len__(self) -> int:
+        return len(self.titles)
+    
+    def severity_counts(self) -> array:
+        """Count vulnerabilities per severity level, indexed by SEV_* constants"""
+        if NUMPY_AVAILABLE and len(self.severities) >= _BINCOUNT_MIN_SIZE:
+            counts = np.bincount(
+                np.asarray(self.severities, dtype=np.int8),
+                minlength=len(SEVERITY_LEVELS)
+            ).tolist()
+        else:
+            counter = Counter(self.severities)
+            counts = [counter[index] for index in range(len(SEVERITY_LEVELS))]
+        return array('i', counts)
+
+
+@dataclass(slots=True)
+class ScanSnapshot:
+    """
+    Picklable copy of everything a PDF report reads from a scan.
+    
+    Lets report builds run in a worker process, which cannot receive
+    ORM instances bound to the request's session.
+    """
+    id: str
+    scan_number: int
+    target_url: str
+    scan_types: List[str]
+    status: str
+    environment_type: Optional[str]
+    options: Optional[Dict[str, Any]]
+    duration_seconds: Optional[int]
+    created_at: datetime
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    risk_score: float
+    vulnerabilities: VulnerabilitySnapshot
+    
+    @classmethod
+    def from_scan(cls, scan: Scan) -> "ScanSnapshot":
+        """Copy the report fields out of a scan with its vulnerabilities loaded"""
+        return cls(
+            id=str(scan.id),
+            scan_number=scan.scan_number,
+            target_url=scan.target_url,
+            scan_types=list(scan.scan_types),
+            status=scan.status.value,
+            environment_type=scan.environment_type,
+            options=scan.options,
+            duration_seconds=scan.duration_seconds,
+            created_at=scan.created_at,
+            started_at=scan.started_at,
+            completed_at=scan.completed_at,
+            risk_score=scan.calculate_risk_score(),
+            vulnerabilities=VulnerabilitySnapshot.from_vulnerabilities(scan.vulnerabilities),
+        )
+
+
+# Report builds are CPU-bound pure Python, so they run in worker processes.
+# The pool and each worker's generator are created lazily and shared process-wide.
+# The semaphore caps builds in flight (snapshots pickled and queued included) to the pool size.
+_REPORT_CONCURRENCY = max(1, (os.cpu_count() or 1) // 2)
+_report_semaphore = asyncio.Semaphore(_REPORT_CONCURRENCY)
+_report_pool: Optional[ProcessPoolExecutor] = None
+_worker_generator: Optional["PDFReportGenerator"] = None
+
+# Whether a report file exists on disk, keyed by path. Reports are written once
+# and rarely deleted, so a short TTL saves a blocking stat on repeat downloads.
+_report_file_exists: TTLCache = TTLCache(maxsize=4096, ttl=30)
+
+
+def _get_report_pool() -> ProcessPoolExecutor:
+    """Return the shared report build process pool"""
+    global _report_pool
+    if _report_pool is None:
+        _report_pool = ProcessPoolExecutor(max_workers=_REPORT_CONCURRENCY)
+    return _report_pool
+
+
+def shutdown_report_pool() -> None:
+    """Stop the report build workers, if the pool was ever started"""
+    global _report_pool
+    if _report_pool is not None:
+        _report_pool.shutdown(wait=True, cancel_futures=True)
+        _report_pool = None
+
+
+async def report_file_exists(file_path: str) -> bool:
+    """Whether a report file exists, stat'ing off the event loop on a cache miss"""
+    exists = _report_file_exists.get(file_path)
+    if exists is None:
+        exists = await asyncio.to_thread(os.path.exists, file_path)
+        _report_file_exists[file_path] = exists
+    return exists
+
+
+def forget_report_file(file_path: str) -> None:
+    """Drop a report file's cached existence, e.g. after deleting it"""
+    _report_file_exists.pop(file_path, None)
+
+
+def _build_pdf_report(report_type: str, scan: ScanSnapshot, output_path: str) -> int:
+    """Build a PDF report inside a pool worker and return its size in bytes"""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = PDFReportGenerator()
+    
+    if report_type == "executive":
+        return _worker_generator._build_executive_summary(scan, output_path)
+    return _worker_generator._build_technical_report(scan, output_path)
+
+
+if REPORTLAB_AVAILABLE:
+    
+    class DetailRowsFlowable(Flowable):
+        """
+        Two-column label/value grid drawn straight onto the canvas.
+        
+        Replaces a per-vulnerability Table in the detailed section: column widths
+        and row height are fixed, so wrap() is constant time and draw() emits the
+        rects and strings directly instead of running Table's layout pass.
+        Values are drawn on a single line, as plain strings in a Table cell are.
+        """
+        
+        FONT_SIZE = 8
+        PADDING = 6
+        ROW_HEIGHT = FONT_SIZE * 1.2 + PADDING
+        LABEL_FILL = HexColor('#f9fafb')
+        TEXT_COLOR = HexColor('#374151')
+        GRID_COLOR = HexColor('#e5e7eb')
+        
+        def __init__(self, rows: List[List[str]], label_width: float, value_width: float):
+            super().__init__()
+            self.rows = rows
+            self.label_width = label_width
+            self.value_width = value_width
+            self.width = label_width + value_width
+            self.height = self.ROW_HEIGHT * len(rows)
+            self.hAlign = 'CENTER'
+        
+        def wrap(self, availWidth, availHeight):
+            return self.width, self.height
+        
+        def draw(self):
+            canvas = self.canv
+            row_height = self.ROW_HEIGHT
+            label_width = self.label_width
+            text_x = self.PADDING
+            value_x = label_width + self.PADDING
+            baseline_offset = self.PADDING / 2 + self.FONT_SIZE * 0.2 + 1
+            
+            canvas.saveState()
+            
+            # Label column background and grid
+            canvas.setFillColor(self.LABEL_FILL)
+            canvas.rect(0, 0, label_width, self.height, stroke=0, fill=1)
+            canvas.setStrokeColor(self.GRID_COLOR)
+            canvas.setLineWidth(0.5)
+            canvas.rect(0, 0, self.width, self.height, stroke=1, fill=0)
+            canvas.line(label_width, 0, label_width, self.height)
+            
+            canvas.setFillColor(self.TEXT_COLOR)
+            y = self.height
+            for label, value in self.rows:
+                y -= row_height
+                if y > 0:
+                    canvas.line(0, y, self.width, y)
+                baseline = y + baseline_offset
+                canvas.setFont('Helvetica-Bold', self.FONT_SIZE)
+                canvas.drawString(text_x, baseline, label)
+                canvas.setFont('Helvetica', self.FONT_SIZE)
+                canvas.drawString(value_x, baseline, str(value))
+            
+            canvas.restoreState()
+
+
 class ReportGenerationException(Exception):
     """Exception raised during report generation"""
     pass
@@ -68,12 +342,19 @@ class PDFReportGenerator:
     - Custom styling and branding
     """
     
+    # Technical reports with more findings than this are written without page compression
+    COMPRESSION_MAX_FINDINGS = 200
+    
+    RISK_EXPLANATIONS = {
+        'Low': 'Baixo risco. As vulnerabilidades encontradas são menores e não representam ameaça imediata.',
+        'Medium': 'Risco médio. Recomenda-se correção das vulnerabilidades em prazo razoável.',
+        'High': 'Alto risco. As vulnerabilidades devem ser corrigidas com prioridade.',
+        'Critical': 'Risco crítico. Correção imediata necessária para evitar comprometimento.'
+    }
+    
     def __init__(self):
         if not REPORTLAB_AVAILABLE:
             raise ReportGenerationException("ReportLab library not available")
-            
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
         
         # Report configuration
         self.page_size = A4
@@ -86,8 +367,11 @@ class PDFReportGenerator:
         self.success_color = HexColor('#16a34a')
         self.info_color = HexColor('#0891b2')
         
+        self.styles = getSampleStyleSheet()
+        self.setup_custom_styles()
+        
     def setup_custom_styles(self):
-        """Set up custom paragraph styles for the report"""
+        """Set up custom paragraph and table styles for the report"""
         
         # Title style
         self.styles.add(ParagraphStyle(
@@ -124,7 +408,7 @@ class PDFReportGenerator:
         
         # Risk level styles
         for severity in ['critical', 'high', 'medium', 'low', 'info']:
-            color = self._get_severity_color(severity)
+            color = _get_severity_color(severity)
             self.styles.add(ParagraphStyle(
                 name=f'Risk{severity.title()}',
                 parent=self.styles['Normal'],
@@ -132,19 +416,48 @@ class PDFReportGenerator:
                 textColor=color,
                 fontName='Helvetica-Bold'
             ))
+        
+        # Table styles, built once and shared by every report
+        self.title_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), HexColor('#f3f4f6')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#1f2937')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ])
+        
+        self.vuln_overview_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), HexColor('#f9fafb')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#374151')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#e5e7eb')),
+        ])
+        
+        self.scan_details_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), HexColor('#f3f4f6')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#1f2937')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ])
+        
+        self.stats_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), HexColor('#f3f4f6')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#1f2937')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
+        ])
     
-    def _get_severity_color(self, severity: str) -> HexColor:
-        """Get color for severity level"""
-        severity_colors = {
-            'critical': HexColor('#7f1d1d'),
-            'high': HexColor('#dc2626'),
-            'medium': HexColor('#d97706'),
-            'low': HexColor('#65a30d'),
-            'info': HexColor('#0891b2')
-        }
-        return severity_colors.get(severity.lower(), HexColor('#6b7280'))
-    
-    async def generate_executive_summary(self, scan: Scan, output_path: str) -> str:
+    async def generate_executive_summary(self, scan: Scan, output_path: str) -> Tuple[str, int]:
         """
         Generate executive summary PDF report
         
@@ -153,47 +466,23 @@ class PDFReportGenerator:
             output_path: Path to save the PDF file
             
         Returns:
-            Path to generated PDF file
+            Tuple of (path to generated PDF file, file size in bytes)
         """
         try:
-            # Create PDF document
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=self.page_size,
-                rightMargin=self.margin,
-                leftMargin=self.margin,
-                topMargin=self.margin,
-                bottomMargin=self.margin
+            # Layout and rendering are CPU bound; run them in a worker process
+            snapshot = ScanSnapshot.from_scan(scan)
+            size_bytes = await asyncio.get_running_loop().run_in_executor(
+                _get_report_pool(), _build_pdf_report, "executive", snapshot, output_path
             )
             
-            story = []
-            
-            # Title page
-            story.extend(self._create_title_page(scan))
-            
-            # Executive summary
-            story.extend(self._create_executive_summary(scan))
-            
-            # Risk assessment
-            story.extend(self._create_risk_assessment(scan))
-            
-            # Vulnerability overview
-            story.extend(self._create_vulnerability_overview(scan))
-            
-            # Recommendations
-            story.extend(self._create_recommendations(scan))
-            
-            # Build PDF
-            doc.build(story)
-            
             logger.info(f"Executive summary PDF generated: {output_path}")
-            return output_path
+            return output_path, size_bytes
             
         except Exception as e:
             logger.error(f"Failed to generate executive summary: {e}")
             raise ReportGenerationException(f"Executive summary generation failed: {str(e)}")
     
-    async def generate_technical_report(self, scan: Scan, output_path: str) -> str:
+    async def generate_technical_report(self, scan: Scan, output_path: str) -> Tuple[str, int]:
         """
         Generate detailed technical PDF report
         
@@ -202,219 +491,210 @@ class PDFReportGenerator:
             output_path: Path to save the PDF file
             
         Returns:
-            Path to generated PDF file
+            Tuple of (path to generated PDF file, file size in bytes)
         """
         try:
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=self.page_size,
-                rightMargin=self.margin,
-                leftMargin=self.margin,
-                topMargin=self.margin,
-                bottomMargin=self.margin
+            # Layout and rendering are CPU bound; run them in a worker process
+            snapshot = ScanSnapshot.from_scan(scan)
+            size_bytes = await asyncio.get_running_loop().run_in_executor(
+                _get_report_pool(), _build_pdf_report, "technical", snapshot, output_path
             )
             
-            story = []
-            
-            # Title page
-            story.extend(self._create_title_page(scan, report_type="Technical"))
-            
-            # Scan details
-            story.extend(self._create_scan_details(scan))
-            
-            # Detailed vulnerabilities
-            story.extend(self._create_detailed_vulnerabilities(scan))
-            
-            # Technical appendix
-            story.extend(self._create_technical_appendix(scan))
-            
-            # Build PDF
-            doc.build(story)
-            
             logger.info(f"Technical report PDF generated: {output_path}")
-            return output_path
+            return output_path, size_bytes
             
         except Exception as e:
             logger.error(f"Failed to generate technical report: {e}")
             raise ReportGenerationException(f"Technical report generation failed: {str(e)}")
     
-    def _create_title_page(self, scan: Scan, report_type: str = "Executive") -> List:
-        """Create the title page elements"""
-        elements = []
+    def _new_document(self, buffer: io.BytesIO, compress: bool = True) -> "SimpleDocTemplate":
+        """Create a PDF document template writing into buffer"""
+        return SimpleDocTemplate(
+            buffer,
+            pagesize=self.page_size,
+            rightMargin=self.margin,
+            leftMargin=self.margin,
+            topMargin=self.margin,
+            bottomMargin=self.margin,
+            pageCompression=1 if compress else 0
+        )
+    
+    def _build_executive_summary(self, scan: ScanSnapshot, output_path: str) -> int:
+        """Synchronously build the executive summary PDF (runs in a worker process)"""
+        # Create PDF document in memory
+        buffer = io.BytesIO()
+        doc = self._new_document(buffer)
+        
+        # Computed once and shared by every section
+        snapshot = scan.vulnerabilities
+        counts = snapshot.severity_counts()
+        risk_score = scan.risk_score
+        
+        # Sections yield their flowables straight into a single story list
+        story = list(chain(
+            self._create_title_page(scan),
+            self._create_executive_summary(scan, counts),
+            self._create_risk_assessment(risk_score, counts),
+            self._create_vulnerability_overview(snapshot),
+            self._create_recommendations(counts),
+        ))
+        
+        # Build PDF and flush it to disk in a single write
+        doc.build(story)
+        return Path(output_path).write_bytes(buffer.getvalue())
+    
+    def _build_technical_report(self, scan: ScanSnapshot, output_path: str) -> int:
+        """Synchronously build the technical report PDF (runs in a worker process)"""
+        # Computed once and shared by every section
+        snapshot = scan.vulnerabilities
+        counts = snapshot.severity_counts()
+        risk_score = scan.risk_score
+        
+        # Large reports are mostly short table strings; compressing their page streams
+        # costs more build time than the file size it saves
+        buffer = io.BytesIO()
+        doc = self._new_document(buffer, compress=len(snapshot) <= self.COMPRESSION_MAX_FINDINGS)
+        
+        # Sections yield their flowables straight into a single story list
+        story = list(chain(
+            self._create_title_page(scan, report_type="Technical"),
+            self._create_scan_details(scan),
+            self._create_detailed_vulnerabilities(snapshot),
+            self._create_technical_appendix(scan, len(snapshot), risk_score, counts),
+        ))
         
+        # Build PDF and flush it to disk in a single write
+        doc.build(story)
+        return Path(output_path).write_bytes(buffer.getvalue())
+    
+    def _create_title_page(self, scan: ScanSnapshot, report_type: str = "Executive") -> Iterator:
+        """Create the title page elements"""
         # Main title
         title = f"ScanIA - Relatório {report_type}"
-        elements.append(Paragraph(title, self.styles['ScanIATitle']))
-        elements.append(Spacer(1, 30))
+        yield Paragraph(title, self.styles['ScanIATitle'])
+        yield Spacer(1, 30)
         
         # Scan information table
         scan_info = [
             ['Target URL:', scan.target_url],
-            ['Data do Scan:', scan.created_at.strftime('%d/%m/%Y %H:%M')],
-            ['Status:', scan.status.value.title()],
+            ['Data do Scan:', _format_datetime(scan.created_at)],
+            ['Status:', scan.status.title()],
             ['Duração:', f"{scan.duration_seconds or 0}s"],
             ['Tipos de Scan:', ', '.join(scan.scan_types)],
         ]
         
         if scan.started_at:
-            scan_info.append(['Iniciado em:', scan.started_at.strftime('%d/%m/%Y %H:%M')])
+            scan_info.append(['Iniciado em:', _format_datetime(scan.started_at)])
         
         if scan.completed_at:
-            scan_info.append(['Concluído em:', scan.completed_at.strftime('%d/%m/%Y %H:%M')])
+            scan_info.append(['Concluído em:', _format_datetime(scan.completed_at)])
         
         table = Table(scan_info, colWidths=[3*cm, 8*cm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), HexColor('#f3f4f6')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#1f2937')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        table.setStyle(self.title_table_style)
         
-        elements.append(table)
-        elements.append(Spacer(1, 40))
+        yield table
+        yield Spacer(1, 40)
         
         # Page break
-        elements.append(PageBreak())
-        
-        return elements
+        yield PageBreak()
     
-    def _create_executive_summary(self, scan: Scan) -> List:
+    def _create_executive_summary(self, scan: ScanSnapshot, counts: array) -> Iterator:
         """Create executive summary section"""
-        elements = []
-        
-        elements.append(Paragraph("Resumo Executivo", self.styles['SectionHeader']))
+        yield Paragraph("Resumo Executivo", self.styles['SectionHeader'])
         
-        summary = scan.vulnerability_summary
-        total_vulns = sum(summary.values())
+        total_vulns = sum(counts)
         
         if total_vulns == 0:
-            elements.append(Paragraph(
+            yield Paragraph(
                 "Parabéns! Nenhuma vulnerabilidade foi identificada durante este scan. "
                 "No entanto, recomendamos scans regulares para manter a segurança.",
                 self.styles['Normal']
-            ))
+            )
         else:
             # Summary paragraph
             summary_text = (
                 f"Este relatório apresenta os resultados da análise de segurança realizada em "
-                f"<b>{scan.target_url}</b>. Foram identificadas <b>{total_vulns}</b> vulnerabilidades, "
-                f"sendo {summary.get('critical', 0)} críticas, {summary.get('high', 0)} altas, "
-                f"{summary.get('medium', 0)} médias, {summary.get('low', 0)} baixas e "
-                f"{summary.get('info', 0)} informativas."
+                f"<b>{escape(scan.target_url)}</b>. Foram identificadas <b>{total_vulns}</b> vulnerabilidades, "
+                f"sendo {counts[SEV_CRIT]} críticas, {counts[SEV_HIGH]} altas, "
+                f"{counts[SEV_MED]} médias, {counts[SEV_LOW]} baixas e "
+                f"{counts[SEV_INFO]} informativas."
             )
             
-            elements.append(Paragraph(summary_text, self.styles['Normal']))
-            elements.append(Spacer(1, 20))
+            yield Paragraph(summary_text, self.styles['Normal'])
+            yield Spacer(1, 20)
             
             # Vulnerability chart
-            chart_image = self._create_vulnerability_chart(summary)
+            chart_image = self._create_vulnerability_chart(counts)
             if chart_image:
-                elements.append(chart_image)
-                elements.append(Spacer(1, 20))
-        
-        return elements
+                yield chart_image
+                yield Spacer(1, 20)
     
-    def _create_risk_assessment(self, scan: Scan) -> List:
+    def _create_risk_assessment(self, risk_score: float, counts: array) -> Iterator:
         """Create risk assessment section"""
-        elements = []
-        
-        elements.append(Paragraph("Avaliação de Risco", self.styles['SectionHeader']))
+        yield Paragraph("Avaliação de Risco", self.styles['SectionHeader'])
         
-        risk_score = scan.calculate_risk_score()
-        risk_level = self._calculate_risk_level(scan.vulnerability_summary)
+        risk_level = self._calculate_risk_level(counts)
         
-        elements.append(Paragraph(f"<b>Nível de Risco Geral:</b> {risk_level}", self.styles['Normal']))
-        elements.append(Paragraph(f"<b>Score de Risco:</b> {risk_score:.1f}/100", self.styles['Normal']))
-        elements.append(Spacer(1, 15))
+        yield Paragraph(f"<b>Nível de Risco Geral:</b> {risk_level}", self.styles['Normal'])
+        yield Paragraph(f"<b>Score de Risco:</b> {risk_score:.1f}/100", self.styles['Normal'])
+        yield Spacer(1, 15)
         
         # Risk level explanation
-        risk_explanations = {
-            'Low': 'Baixo risco. As vulnerabilidades encontradas são menores e não representam ameaça imediata.',
-            'Medium': 'Risco médio. Recomenda-se correção das vulnerabilidades em prazo razoável.',
-            'High': 'Alto risco. As vulnerabilidades devem ser corrigidas com prioridade.',
-            'Critical': 'Risco crítico. Correção imediata necessária para evitar comprometimento.'
-        }
+        if risk_level in self.RISK_EXPLANATIONS:
+            yield Paragraph(self.RISK_EXPLANATIONS[risk_level], self.styles['Normal'])
         
-        if risk_level in risk_explanations:
-            elements.append(Paragraph(risk_explanations[risk_level], self.styles['Normal']))
-        
-        elements.append(Spacer(1, 20))
-        
-        return elements
+        yield Spacer(1, 20)
     
-    def _create_vulnerability_overview(self, scan: Scan) -> List:
+    def _create_vulnerability_overview(self, snapshot: VulnerabilitySnapshot) -> Iterator:
         """Create vulnerability overview section"""
-        elements = []
+        yield Paragraph("Principais Vulnerabilidades", self.styles['SectionHeader'])
         
-        elements.append(Paragraph("Principais Vulnerabilidades", self.styles['SectionHeader']))
+        if not snapshot:
+            yield Paragraph("Nenhuma vulnerabilidade encontrada.", self.styles['Normal'])
+            return
         
-        if not scan.vulnerabilities:
-            elements.append(Paragraph("Nenhuma vulnerabilidade encontrada.", self.styles['Normal']))
-            return elements
+        # Top 10 vulnerabilities by severity and CVSS score, without sorting the full list
+        top_indices = heapq.nlargest(10, range(len(snapshot)), key=snapshot.sort_keys.__getitem__)
         
-        # Sort vulnerabilities by severity and CVSS score
-        sorted_vulns = sorted(
-            scan.vulnerabilities,
-            key=lambda v: (v.severity_weight, v.cvss_score or 0),
-            reverse=True
-        )
-        
-        # Show top 10 vulnerabilities
-        for i, vuln in enumerate(sorted_vulns[:10], 1):
-            elements.append(Paragraph(f"{i}. {vuln.title}", self.styles['VulnTitle']))
+        for i, index in enumerate(top_indices, 1):
+            yield Paragraph(f"{i}. {escape(snapshot.titles[index])}", self.styles['VulnTitle'])
             
             # Vulnerability details table
             vuln_data = [
-                ['Severidade:', vuln.severity.value.title()],
-                ['CVSS Score:', str(vuln.cvss_score or 'N/A')],
-                ['URL Afetada:', vuln.affected_url],
+                ['Severidade:', SEVERITY_LEVELS[snapshot.severities[index]].title()],
+                ['CVSS Score:', str(snapshot.cvss_scores[index] or 'N/A')],
+                ['URL Afetada:', snapshot.urls[index]],
             ]
             
-            if vuln.cve_id:
-                vuln_data.append(['CVE ID:', vuln.cve_id])
+            if snapshot.cve_ids[index]:
+                vuln_data.append(['CVE ID:', snapshot.cve_ids[index]])
             
             table = Table(vuln_data, colWidths=[3*cm, 8*cm])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), HexColor('#f9fafb')),
-                ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#374151')),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#e5e7eb')),
-            ]))
+            table.setStyle(self.vuln_overview_table_style)
             
-            elements.append(table)
-            elements.append(Spacer(1, 15))
-        
-        if len(sorted_vulns) > 10:
-            remaining = len(sorted_vulns) - 10
-            elements.append(Paragraph(f"... e mais {remaining} vulnerabilidades no relatório técnico.", self.styles['Normal']))
+            yield table
+            yield Spacer(1, 15)
         
-        return elements
+        if len(snapshot) > 10:
+            remaining = len(snapshot) - 10
+            yield Paragraph(f"... e mais {remaining} vulnerabilidades no relatório técnico.", self.styles['Normal'])
     
-    def _create_recommendations(self, scan: Scan) -> List:
+    def _create_recommendations(self, counts: array) -> Iterator:
         """Create recommendations section"""
-        elements = []
+        yield Paragraph("Recomendações", self.styles['SectionHeader'])
         
-        elements.append(Paragraph("Recomendações", self.styles['SectionHeader']))
-        
-        summary = scan.vulnerability_summary
         recommendations = []
         
-        if summary.get('critical', 0) > 0:
+        if counts[SEV_CRIT] > 0:
             recommendations.append("Corrigir imediatamente todas as vulnerabilidades críticas encontradas.")
         
-        if summary.get('high', 0) > 0:
+        if counts[SEV_HIGH] > 0:
             recommendations.append("Priorizar a correção de vulnerabilidades de alto risco.")
         
-        if summary.get('medium', 0) > 0:
+        if counts[SEV_MED] > 0:
             recommendations.append("Planejar correção de vulnerabilidades médias no próximo ciclo de manutenção.")
         
-        if sum(summary.values()) > 0:
+        if sum(counts) > 0:
             recommendations.extend([
                 "Implementar um programa regular de scans de segurança.",
                 "Revisar e atualizar políticas de segurança da aplicação.",
@@ -429,16 +709,12 @@ class PDFReportGenerator:
             ])
         
         for rec in recommendations:
-            elements.append(Paragraph(f"• {rec}", self.styles['Normal']))
-            elements.append(Spacer(1, 8))
-        
-        return elements
+            yield Paragraph(f"• {rec}", self.styles['Normal'])
+            yield Spacer(1, 8)
     
-    def _create_scan_details(self, scan: Scan) -> List:
+    def _create_scan_details(self, scan: ScanSnapshot) -> Iterator:
         """Create detailed scan information section"""
-        elements = []
-        
-        elements.append(Paragraph("Detalhes do Scan", self.styles['SectionHeader']))
+        yield Paragraph("Detalhes do Scan", self.styles['SectionHeader'])
         
         # Detailed scan information
         scan_details = [
@@ -447,215 +723,172 @@ class PDFReportGenerator:
             ['Target URL:', scan.target_url],
             ['Tipos de Scan:', ', '.join(scan.scan_types)],
             ['Ambiente:', scan.environment_type or 'N/A'],
-            ['Status:', scan.status.value.title()],
+            ['Status:', scan.status.title()],
         ]
         
         if scan.options:
-            scan_details.append(['Opções:', json.dumps(scan.options, indent=2)])
+            scan_details.append(['Opções:', 'ver abaixo'])
         
         table = Table(scan_details, colWidths=[4*cm, 12*cm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), HexColor('#f3f4f6')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#1f2937')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        table.setStyle(self.scan_details_table_style)
+        
+        yield table
         
-        elements.append(table)
-        elements.append(Spacer(1, 20))
+        # Options go below the table as fixed-width text, which needs no wrap measurement
+        if scan.options:
+            yield Spacer(1, 8)
+            yield Preformatted(json.dumps(scan.options, indent=2, ensure_ascii=False), self.styles['Code'])
         
-        return elements
+        yield Spacer(1, 20)
     
-    def _create_detailed_vulnerabilities(self, scan: Scan) -> List:
+    def _create_detailed_vulnerabilities(self, snapshot: VulnerabilitySnapshot) -> Iterator:
         """Create detailed vulnerability section"""
-        elements = []
+        yield Paragraph("Vulnerabilidades Detalhadas", self.styles['SectionHeader'])
         
-        elements.append(Paragraph("Vulnerabilidades Detalhadas", self.styles['SectionHeader']))
+        if not snapshot:
+            yield Paragraph("Nenhuma vulnerabilidade encontrada.", self.styles['Normal'])
+            return
         
-        if not scan.vulnerabilities:
-            elements.append(Paragraph("Nenhuma vulnerabilidade encontrada.", self.styles['Normal']))
-            return elements
+        # Group vulnerability indices by severity, in report order
+        vuln_groups = [[] for _ in SEVERITY_LEVELS]
+        for index, severity_index in enumerate(snapshot.severities):
+            vuln_groups[severity_index].append(index)
         
-        # Group vulnerabilities by severity
-        vuln_groups = {}
-        for vuln in scan.vulnerabilities:
-            severity = vuln.severity.value
-            if severity not in vuln_groups:
-                vuln_groups[severity] = []
-            vuln_groups[severity].append(vuln)
+        normal_style = self.styles['Normal']
         
         # Process each severity group
-        severity_order = ['critical', 'high', 'medium', 'low', 'info']
-        
-        for severity in severity_order:
-            if severity not in vuln_groups:
+        for severity, indices in zip(SEVERITY_LEVELS, vuln_groups):
+            if not indices:
                 continue
                 
-            vulns = vuln_groups[severity]
-            elements.append(Paragraph(f"Vulnerabilidades {severity.title()} ({len(vulns)})", self.styles['VulnTitle']))
+            severity_title = severity.title()
+            yield Paragraph(f"Vulnerabilidades {severity_title} ({len(indices)})", self.styles['VulnTitle'])
             
-            for i, vuln in enumerate(vulns, 1):
-                elements.append(Paragraph(f"{i}. {vuln.title}", self.styles['Normal']))
-                elements.append(Spacer(1, 8))
-                
-                # Description
-                elements.append(Paragraph(f"<b>Descrição:</b>", self.styles['Normal']))
-                elements.append(Paragraph(vuln.description, self.styles['Normal']))
-                elements.append(Spacer(1, 8))
+            for i, index in enumerate(indices, 1):
+                # Scanner output is plain text; escape it so the paragraph parser sees no markup.
+                # Flowables keep layout state, so each one appears in the story only once.
+                yield Paragraph(f"{i}. {escape(snapshot.titles[index])}", normal_style)
+                yield Spacer(1, 8)
+                yield Paragraph("<b>Descrição:</b>", normal_style)
+                yield Paragraph(escape(snapshot.descriptions[index] or ''), normal_style)
+                yield Spacer(1, 8)
                 
                 # Solution
-                if vuln.solution:
-                    elements.append(Paragraph(f"<b>Solução:</b>", self.styles['Normal']))
-                    elements.append(Paragraph(vuln.solution, self.styles['Normal']))
-                    elements.append(Spacer(1, 8))
+                solution = snapshot.solutions[index]
+                if solution:
+                    yield Paragraph("<b>Solução:</b>", normal_style)
+                    yield Paragraph(escape(solution), normal_style)
+                    yield Spacer(1, 8)
                 
                 # Technical details
                 tech_details = [
-                    ['URL Afetada:', vuln.affected_url],
-                    ['Severidade:', vuln.severity.value.title()],
-                    ['CVSS Score:', str(vuln.cvss_score or 'N/A')],
+                    ['URL Afetada:', snapshot.urls[index]],
+                    ['Severidade:', severity_title],
+                    ['CVSS Score:', str(snapshot.cvss_scores[index] or 'N/A')],
                 ]
                 
-                if vuln.cve_id:
-                    tech_details.append(['CVE ID:', vuln.cve_id])
+                if snapshot.cve_ids[index]:
+                    tech_details.append(['CVE ID:', snapshot.cve_ids[index]])
                 
-                if vuln.affected_parameter:
-                    tech_details.append(['Parâmetro:', vuln.affected_parameter])
+                if snapshot.parameters[index]:
+                    tech_details.append(['Parâmetro:', snapshot.parameters[index]])
                 
-                table = Table(tech_details, colWidths=[3*cm, 9*cm])
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), HexColor('#f9fafb')),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#374151')),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 8),
-                    ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#e5e7eb')),
-                ]))
-                
-                elements.append(table)
-                elements.append(Spacer(1, 20))
-        
-        return elements
+                yield DetailRowsFlowable(tech_details, 3*cm, 9*cm)
+                yield Spacer(1, 20)
     
-    def _create_technical_appendix(self, scan: Scan) -> List:
+    def _create_technical_appendix(
+        self,
+        scan: ScanSnapshot,
+        total_vulns: int,
+        risk_score: float,
+        counts: array
+    ) -> Iterator:
         """Create technical appendix section"""
-        elements = []
-        
-        elements.append(PageBreak())
-        elements.append(Paragraph("Apêndice Técnico", self.styles['SectionHeader']))
+        yield PageBreak()
+        yield Paragraph("Apêndice Técnico", self.styles['SectionHeader'])
         
         # Scan statistics
-        elements.append(Paragraph("Estatísticas do Scan", self.styles['Heading2']))
+        yield Paragraph("Estatísticas do Scan", self.styles['Heading2'])
         
         stats = [
-            ['Total de Vulnerabilidades:', str(len(scan.vulnerabilities))],
-            ['Score de Risco:', f"{scan.calculate_risk_score():.1f}/100"],
+            ['Total de Vulnerabilidades:', str(total_vulns)],
+            ['Score de Risco:', f"{risk_score:.1f}/100"],
             ['Duração do Scan:', f"{scan.duration_seconds or 0} segundos"],
         ]
         
-        summary = scan.vulnerability_summary
-        for severity, count in summary.items():
+        for severity, count in zip(SEVERITY_LEVELS, counts):
             stats.append([f"Vulnerabilidades {severity.title()}:", str(count)])
         
         table = Table(stats, colWidths=[5*cm, 3*cm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), HexColor('#f3f4f6')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#1f2937')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
-        ]))
+        table.setStyle(self.stats_table_style)
         
-        elements.append(table)
-        elements.append(Spacer(1, 20))
+        yield table
+        yield Spacer(1, 20)
         
         # Methodology
-        elements.append(Paragraph("Metodologia", self.styles['Heading2']))
+        yield Paragraph("Metodologia", self.styles['Heading2'])
         methodology_text = (
             "Este scan foi realizado utilizando ferramentas automatizadas de segurança, incluindo "
             "OWASP ZAP para vulnerabilidades de aplicações web e Nmap para análise de rede. "
             "Os resultados foram processados e classificados de acordo com o padrão CVSS (Common "
             "Vulnerability Scoring System) para priorização de correções."
         )
-        elements.append(Paragraph(methodology_text, self.styles['Normal']))
-        
-        return elements
+        yield Paragraph(methodology_text, self.styles['Normal'])
     
-    def _create_vulnerability_chart(self, summary: Dict[str, int]):
+    def _create_vulnerability_chart(self, counts: array):
         """Create vulnerability distribution chart"""
-        if not MATPLOTLIB_AVAILABLE or sum(summary.values()) == 0:
+        total = sum(counts)
+        if total == 0:
             return None
             
         try:
-            # Create pie chart
-            fig, ax = plt.subplots(figsize=(8, 6))
-            
             labels = []
             sizes = []
             colors = []
             
-            severity_colors = {
-                'critical': '#7f1d1d',
-                'high': '#dc2626', 
-                'medium': '#d97706',
-                'low': '#65a30d',
-                'info': '#0891b2'
-            }
-            
-            for severity, count in summary.items():
+            for severity, count in zip(SEVERITY_LEVELS, counts):
                 if count > 0:
-                    labels.append(f"{severity.title()} ({count})")
+                    labels.append(f"{severity.title()} ({count}, {count * 100 / total:.1f}%)")
                     sizes.append(count)
-                    colors.append(severity_colors.get(severity, '#6b7280'))
+                    colors.append(_get_severity_color(severity))
             
             if not sizes:
                 return None
             
-            ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
-            ax.set_title('Distribuição de Vulnerabilidades por Severidade', fontsize=14, fontweight='bold')
-            
-            # Save to temporary file
-            chart_path = f"/tmp/vuln_chart_{uuid.uuid4()}.png"
-            plt.savefig(chart_path, dpi=300, bbox_inches='tight', facecolor='white')
-            plt.close()
-            
-            # Create ReportLab image
-            img = Image(chart_path, width=12*cm, height=9*cm)
+            # Vector pie chart drawn straight into the PDF story
+            drawing = Drawing(12*cm, 9*cm)
+            drawing.add(String(
+                6*cm, 8.3*cm,
+                'Distribuição de Vulnerabilidades por Severidade',
+                fontName='Helvetica-Bold',
+                fontSize=12,
+                textAnchor='middle'
+            ))
             
-            # Clean up temporary file
-            try:
-                Path(chart_path).unlink()
-            except Exception:
-                pass
+            pie = Pie()
+            pie.x = 3.5*cm
+            pie.y = 1*cm
+            pie.width = 5.5*cm
+            pie.height = 5.5*cm
+            pie.data = sizes
+            pie.labels = labels
+            pie.startAngle = 90
+            pie.direction = 'clockwise'
+            pie.slices.strokeColor = HexColor('#ffffff')
+            pie.slices.fontSize = 8
+            for i, color in enumerate(colors):
+                pie.slices[i].fillColor = color
             
-            return img
+            drawing.add(pie)
+            return drawing
             
         except Exception as e:
             logger.warning(f"Failed to create vulnerability chart: {e}")
             return None
     
-    def _calculate_risk_level(self, summary: Dict[str, int]) -> str:
-        """Calculate overall risk level based on vulnerability summary"""
-        if summary.get('critical', 0) > 0:
-            return 'Critical'
-        elif summary.get('high', 0) > 2:
-            return 'Critical'
-        elif summary.get('high', 0) > 0:
-            return 'High'
-        elif summary.get('medium', 0) > 5:
-            return 'High'
-        elif summary.get('medium', 0) > 0:
-            return 'Medium'
-        elif summary.get('low', 0) > 10:
-            return 'Medium'
-        elif summary.get('low', 0) > 0:
-            return 'Low'
-        else:
-            return 'Low'
+    def _calculate_risk_level(self, counts: array) -> str:
+        """Calculate overall risk level based on per-severity counts"""
+        return _risk_level(counts[SEV_CRIT], counts[SEV_HIGH], counts[SEV_MED], counts[SEV_LOW])
 
 
 class ReportService:
@@ -689,13 +922,14 @@ class ReportService:
             Report ID
         """
         try:
-            # Get scan with vulnerabilities
+            # Get scan with vulnerabilities in a single round-trip; every report
+            # reads all of them, so the joined rows are fully used
             result = await self.db.execute(
                 select(Scan)
-                .options(selectinload(Scan.vulnerabilities))
+                .options(joinedload(Scan.vulnerabilities))
                 .where(Scan.id == scan_id)
             )
-            scan = result.scalar_one_or_none()
+            scan = result.unique().scalar_one_or_none()
             
             if not scan:
                 raise ReportGenerationException(f"Scan not found: {scan_id}")
@@ -725,40 +959,36 @@ class ReportService:
     
     async def _generate_report_async(self, report_id: str, scan: Scan, report_type: str):
         """Generate report asynchronously"""
+        # The request's session is closed once its response is sent, so the report
+        # row is reloaded and updated through sessions owned by this task
         try:
-            # Get report record
-            result = await self.db.execute(
-                select(Report).where(Report.id == report_id)
-            )
-            report = result.scalar_one_or_none()
-            
-            if not report:
-                logger.error(f"Report not found: {report_id}")
-                return
-            
             # Generate file path
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = datetime.now().isoformat(timespec='seconds').translate(_FILENAME_TIMESTAMP_TABLE)
             filename = f"scan_{scan.scan_number}_{report_type}_{timestamp}.pdf"
             file_path = self.reports_dir / filename
             
-            # Generate PDF
-            if report_type == "executive":
-                await self.pdf_generator.generate_executive_summary(scan, str(file_path))
-            elif report_type == "technical":
-                await self.pdf_generator.generate_technical_report(scan, str(file_path))
-            else:
-                raise ReportGenerationException(f"Unknown report type: {report_type}")
+            # Generate PDF, waiting for a free build slot
+            async with _report_semaphore:
+                if report_type == "executive":
+                    _, file_size = await self.pdf_generator.generate_executive_summary(scan, str(file_path))
+                elif report_type == "technical":
+                    _, file_size = await self.pdf_generator.generate_technical_report(scan, str(file_path))
+                else:
+                    raise ReportGenerationException(f"Unknown report type: {report_type}")
             
             # Update report record
-            file_size = file_path.stat().st_size
-            
-            report.status = ReportStatus.COMPLETED
-            report.file_path = str(file_path)
-            report.file_size = file_size
-            report.mime_type = "application/pdf"
-            report.generated_at = datetime.utcnow()
-            
-            await self.db.commit()
+            async with get_db_session() as db:
+                report = await db.get(Report, report_id)
+                
+                if not report:
+                    logger.error(f"Report not found: {report_id}")
+                    return
+                
+                report.status = ReportStatus.COMPLETED
+                report.file_path = str(file_path)
+                report.file_size = file_size
+                report.mime_type = "application/pdf"
+                report.generated_at = datetime.utcnow()
             
             logger.info(f"Report generated successfully: {report_id}")
             
@@ -767,15 +997,12 @@ class ReportService:
             
             # Update report status to failed
             try:
-                result = await self.db.execute(
-                    select(Report).where(Report.id == report_id)
-                )
-                report = result.scalar_one_or_none()
-                
-                if report:
-                    report.status = ReportStatus.FAILED
-                    report.error_message = str(e)
-                    await self.db.commit()
+                async with get_db_session() as db:
+                    report = await db.get(Report, report_id)
+                    
+                    if report:
+                        report.status = ReportStatus.FAILED
+                        report.error_message = str(e)
                     
             except Exception as update_error:
                 logger.error(f"Failed to update report status: {update_error}")
@@ -796,13 +1023,10 @@ class ReportService:
         )
         return result.scalars().all()
     
-    def get_report_file_path(self, report: Report) -> Optional[str]:
+    async def get_report_file_path(self, report: Report) -> Optional[str]:
         """Get the file path for a completed report"""
         if report.status != ReportStatus.COMPLETED or not report.file_path:
             return None
         
-        file_path = Path(report.file_path)
-        if file_path.exists():
-            return str(file_path)
-        
-        return None
\ No newline at end of file
+        file_path = report.file_path
+        return file_path if await report_file_exists(file_path) else None
\ No newline at end of file
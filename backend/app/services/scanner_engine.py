@@ -5,12 +5,24 @@ Scanner Engine - Core scanning functionality
 import asyncio
 import logging
 import json
+import random
 import uuid
-from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from urllib.parse import urlparse
-import requests
+import aiohttp
+from cachetools import TTLCache
+from sqlalchemy import Integer, cast, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+# ZAP can return multi-megabyte alert lists; prefer orjson for decoding them
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 from app.models.scan import Scan, ScanStatus
 from app.models.vulnerability import Vulnerability, VulnerabilitySeverity, VulnerabilityStatus
@@ -19,6 +31,52 @@ from app.core.logging_simple import get_logger
 
 logger = get_logger(__name__)
 
+# ZAP status polling: start fast for small targets, back off for long scans
+ZAP_POLL_INITIAL_DELAY = 1.0
+ZAP_POLL_BACKOFF = 1.5
+ZAP_POLL_MAX_DELAY = 30.0
+# Consecutive failed status polls tolerated before the scan is abandoned
+ZAP_POLL_MAX_FAILURES = 5
+
+# Every ZAP API call is bounded so a hung ZAP cannot pin a scan forever
+ZAP_TIMEOUT = aiohttp.ClientTimeout(total=30, sock_connect=5, sock_read=25)
+
+# Alerts fetched per ZAP API request
+ZAP_ALERTS_PAGE_SIZE = 500
+
+# Scan timestamps are taken by the database, in UTC like the rest of the schema
+_UTC_NOW = func.timezone("utc", func.now())
+
+# Findings are unique per (scan, vulnerability, url, parameter); see
+# idx_vulnerabilities_scan_finding, created by app.core.database.create_tables
+_INSERT_FINDINGS = pg_insert(Vulnerability).on_conflict_do_nothing(
+    index_elements=[
+        Vulnerability.scan_id,
+        Vulnerability.vulnerability_id,
+        Vulnerability.affected_url,
+        func.coalesce(Vulnerability.affected_parameter, "")
+    ]
+)
+
+# Nmap/Nikto findings keyed by (scanner, target_url), stored without a scan_id.
+# A target rescanned within the TTL reuses them instead of probing again.
+SCAN_RESULT_CACHE_TTL = 300
+_scan_result_cache: TTLCache = TTLCache(maxsize=1024, ttl=SCAN_RESULT_CACHE_TTL)
+
+# ZAP alert risk label -> severity
+_ZAP_RISK_MAP = {
+    "High": VulnerabilitySeverity.HIGH,
+    "Medium": VulnerabilitySeverity.MEDIUM,
+    "Low": VulnerabilitySeverity.LOW,
+    "Informational": VulnerabilitySeverity.INFO
+}
+
+
+@lru_cache(maxsize=1024)
+def _parse_target(url: str):
+    """Parse a scan target URL, reusing the result for repeat targets"""
+    return urlparse(url)
+
 
 class ScannerEngine:
     """Main scanner engine that orchestrates different scanning tools"""
@@ -27,80 +85,123 @@ class ScannerEngine:
         self.db = db
         self.zap_api_url = f"http://{settings.OWASP_ZAP_HOST}:{settings.OWASP_ZAP_PORT}"
         self.zap_api_key = settings.OWASP_ZAP_API_KEY
+        self._http: Optional[aiohttp.ClientSession] = None
+    
+    def _get_http(self) -> aiohttp.ClientSession:
+        """Get the pooled HTTP session for the ZAP API, creating it on first use"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                base_url=self.zap_api_url,
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60),
+                timeout=ZAP_TIMEOUT
+            )
+        return self._http
+    
+    async def _close_http(self) -> None:
+        """Close the ZAP API session, if one was opened"""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
     
     async def execute_scan(self, scan: Scan) -> bool:
         """Execute a security scan"""
+        # Kept outside the ORM instance, which a rollback would expire
+        scan_id = scan.id
+        
         try:
-            logger.info(f"Starting scan execution: {scan.id}")
+            logger.info(f"Starting scan execution: {scan_id}")
             
             # Update scan status
-            scan.status = ScanStatus.RUNNING
-            scan.started_at = datetime.utcnow()
+            await self.db.execute(
+                update(Scan)
+                .where(Scan.id == scan_id)
+                .values(status=ScanStatus.RUNNING, started_at=_UTC_NOW)
+            )
             await self.db.commit()
             
-            # Execute scan types
-            vulnerabilities = []
+            # Execute scan types concurrently; they are independent tools
+            scanners = []
             
             if "owasp_zap" in scan.scan_types:
-                zap_vulns = await self._execute_zap_scan(scan)
-                vulnerabilities.extend(zap_vulns)
+                scanners.append(("owasp_zap", self._execute_zap_scan(scan)))
             
             if "nmap" in scan.scan_types:
-                nmap_vulns = await self._execute_nmap_scan(scan)
-                vulnerabilities.extend(nmap_vulns)
+                scanners.append(("nmap", self._execute_nmap_scan(scan)))
             
             if "nikto" in scan.scan_types:
-                nikto_vulns = await self._execute_nikto_scan(scan)
-                vulnerabilities.extend(nikto_vulns)
-            
-            # Save vulnerabilities to database
-            for vuln_data in vulnerabilities:
-                vulnerability = Vulnerability(**vuln_data)
-                self.db.add(vulnerability)
+                scanners.append(("nikto", self._execute_nikto_scan(scan)))
             
-            # Update scan completion
-            scan.status = ScanStatus.COMPLETED
-            scan.completed_at = datetime.utcnow()
-            
-            if scan.started_at:
-                duration = scan.completed_at - scan.started_at
-                scan.duration_seconds = int(duration.total_seconds())
+            results = await asyncio.gather(
+                *(coro for _, coro in scanners),
+                return_exceptions=True
+            )
             
+            vulnerabilities = []
+            for (scan_type, _), result in zip(scanners, results):
+                if isinstance(result, Exception):
+                    # One scanner failing must not discard the others' findings
+                    logger.error(f"{scan_type} scan failed: {scan_id} - {result}")
+                    continue
+                vulnerabilities.extend(result)
+            
+            # Save vulnerabilities to database in one bulk INSERT; repeated
+            # findings (ZAP reports the same alert on retests) are dropped server-side
+            if vulnerabilities:
+                await self.db.execute(_INSERT_FINDINGS, vulnerabilities)
+            
+            # Update scan completion in the same transaction as the findings
+            await self.db.execute(
+                update(Scan)
+                .where(Scan.id == scan_id)
+                .values(
+                    status=ScanStatus.COMPLETED,
+                    completed_at=_UTC_NOW,
+                    duration_seconds=cast(func.extract("epoch", _UTC_NOW - Scan.started_at), Integer)
+                )
+            )
             await self.db.commit()
             
-            logger.info(f"Scan completed: {scan.id} with {len(vulnerabilities)} vulnerabilities")
+            logger.info(f"Scan completed: {scan_id} with {len(vulnerabilities)} vulnerabilities")
             return True
             
         except Exception as e:
-            logger.error(f"Scan execution failed: {scan.id} - {str(e)}")
-            
-            # Update scan status to failed
-            scan.status = ScanStatus.FAILED
-            scan.error_message = str(e)
+            logger.error(f"Scan execution failed: {scan_id} - {str(e)}")
+            
+            # Update scan status to failed, discarding any partial inserts
+            await self.db.rollback()
+            await self.db.execute(
+                update(Scan)
+                .where(Scan.id == scan_id)
+                .values(status=ScanStatus.FAILED, error_message=str(e))
+            )
             await self.db.commit()
             
             return False
+        
+        finally:
+            await self._close_http()
     
     async def _execute_zap_scan(self, scan: Scan) -> List[Dict[str, Any]]:
         """Execute OWASP ZAP scan"""
         logger.info(f"Executing ZAP scan for: {scan.target_url}")
         
         try:
+            http = self._get_http()
+            
             # Start ZAP session
             session_name = f"scan_{scan.id}"
             
             # Create new session
-            response = requests.get(
-                f"{self.zap_api_url}/JSON/core/action/newSession/",
+            async with http.get(
+                "/JSON/core/action/newSession/",
                 params={
                     "apikey": self.zap_api_key,
                     "name": session_name,
                     "overwrite": "true"
                 }
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to create ZAP session: {response.text}")
+            ) as response:
+                if response.status != 200:
+                    raise Exception(f"Failed to create ZAP session: {await response.text()}")
             
             # Spider the target
             await self._zap_spider(scan.target_url)
@@ -108,26 +209,33 @@ class ScannerEngine:
             # Active scan
             await self._zap_active_scan(scan.target_url)
             
-            # Get alerts (vulnerabilities)
-            alerts_response = requests.get(
-                f"{self.zap_api_url}/JSON/core/view/alerts/",
-                params={
-                    "apikey": self.zap_api_key,
-                    "baseurl": scan.target_url
-                }
-            )
-            
-            if alerts_response.status_code != 200:
-                raise Exception(f"Failed to get ZAP alerts: {alerts_response.text}")
-            
-            alerts_data = alerts_response.json()
+            # Get alerts (vulnerabilities) a page at a time, so only one page of
+            # raw JSON is buffered and decoded at once
+            parse_alert = self._parse_zap_alert
+            scan_id = scan.id
             vulnerabilities = []
-            
-            for alert in alerts_data.get("alerts", []):
-                vulnerability = self._parse_zap_alert(alert, scan.id)
-                vulnerabilities.append(vulnerability)
-            
-            return vulnerabilities
+            start = 0
+            
+            while True:
+                async with http.get(
+                    "/JSON/core/view/alerts/",
+                    params={
+                        "apikey": self.zap_api_key,
+                        "baseurl": scan.target_url,
+                        "start": str(start),
+                        "count": str(ZAP_ALERTS_PAGE_SIZE)
+                    }
+                ) as alerts_response:
+                    if alerts_response.status != 200:
+                        raise Exception(f"Failed to get ZAP alerts: {await alerts_response.text()}")
+                    
+                    alerts = _json_loads(await alerts_response.read()).get("alerts", ())
+                
+                vulnerabilities.extend(parse_alert(alert, scan_id) for alert in alerts)
+                
+                if len(alerts) < ZAP_ALERTS_PAGE_SIZE:
+                    return vulnerabilities
+                start += ZAP_ALERTS_PAGE_SIZE
             
         except Exception as e:
             logger.error(f"ZAP scan failed: {str(e)}")
@@ -136,109 +244,115 @@ class ScannerEngine:
     async def _zap_spider(self, target_url: str) -> None:
         """Run ZAP spider"""
         logger.info(f"Starting ZAP spider for: {target_url}")
+        http = self._get_http()
         
         # Start spider
-        response = requests.get(
-            f"{self.zap_api_url}/JSON/spider/action/scan/",
+        async with http.get(
+            "/JSON/spider/action/scan/",
             params={
                 "apikey": self.zap_api_key,
                 "url": target_url,
                 "maxChildren": "10",
                 "recurse": "true"
             }
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"Failed to start spider: {response.text}")
-        
-        scan_id = response.json().get("scan")
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to start spider: {await response.text()}")
+            
+            scan_id = _json_loads(await response.read()).get("scan")
         
         # Wait for spider to complete
-        while True:
-            status_response = requests.get(
-                f"{self.zap_api_url}/JSON/spider/view/status/",
-                params={
-                    "apikey": self.zap_api_key,
-                    "scanId": scan_id
-                }
-            )
-            
-            if status_response.status_code == 200:
-                status = int(status_response.json().get("status", 0))
-                if status >= 100:
-                    break
-            
-            await asyncio.sleep(2)
+        await self._zap_wait_for_completion("/JSON/spider/view/status/", scan_id)
         
         logger.info("ZAP spider completed")
     
     async def _zap_active_scan(self, target_url: str) -> None:
         """Run ZAP active scan"""
         logger.info(f"Starting ZAP active scan for: {target_url}")
+        http = self._get_http()
         
         # Start active scan
-        response = requests.get(
-            f"{self.zap_api_url}/JSON/ascan/action/scan/",
+        async with http.get(
+            "/JSON/ascan/action/scan/",
             params={
                 "apikey": self.zap_api_key,
                 "url": target_url,
                 "recurse": "true",
                 "inScopeOnly": "false"
             }
-        )
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to start active scan: {await response.text()}")
+            
+            scan_id = _json_loads(await response.read()).get("scan")
+        
+        # Wait for active scan to complete
+        await self._zap_wait_for_completion("/JSON/ascan/view/status/", scan_id)
         
-        if response.status_code != 200:
-            raise Exception(f"Failed to start active scan: {response.text}")
+        logger.info("ZAP active scan completed")
+    
+    async def _zap_wait_for_completion(self, status_path: str, zap_scan_id: str) -> None:
+        """Poll a ZAP status endpoint until it reports 100%, backing off between polls.
         
-        scan_id = response.json().get("scan")
+        A failed poll (timeout, connection error or non-200 reply) is retried on the
+        next tick; only ZAP_POLL_MAX_FAILURES failures in a row abandon the scan.
+        """
+        http = self._get_http()
+        delay = ZAP_POLL_INITIAL_DELAY
+        failures = 0
         
-        # Wait for active scan to complete
         while True:
-            status_response = requests.get(
-                f"{self.zap_api_url}/JSON/ascan/view/status/",
-                params={
-                    "apikey": self.zap_api_key,
-                    "scanId": scan_id
-                }
-            )
-            
-            if status_response.status_code == 200:
-                status = int(status_response.json().get("status", 0))
+            try:
+                async with http.get(
+                    status_path,
+                    params={
+                        "apikey": self.zap_api_key,
+                        "scanId": zap_scan_id
+                    }
+                ) as status_response:
+                    if status_response.status != 200:
+                        raise aiohttp.ClientResponseError(
+                            status_response.request_info,
+                            status_response.history,
+                            status=status_response.status
+                        )
+                    status = int(_json_loads(await status_response.read()).get("status", 0))
+                failures = 0
                 if status >= 100:
-                    break
-            
-            await asyncio.sleep(5)
-        
-        logger.info("ZAP active scan completed")
+                    return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                failures += 1
+                if failures >= ZAP_POLL_MAX_FAILURES:
+                    raise Exception(f"ZAP status polling failed {failures} times in a row: {e}")
+                logger.warning(f"ZAP status poll failed ({failures}/{ZAP_POLL_MAX_FAILURES}): {e}")
+            
+            # Jitter keeps concurrent scans from polling ZAP in lockstep
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * ZAP_POLL_BACKOFF, ZAP_POLL_MAX_DELAY)
     
     def _parse_zap_alert(self, alert: Dict[str, Any], scan_id: str) -> Dict[str, Any]:
         """Parse ZAP alert into vulnerability format"""
+        get = alert.get
         
-        # Map ZAP risk to severity
-        risk_mapping = {
-            "High": VulnerabilitySeverity.HIGH,
-            "Medium": VulnerabilitySeverity.MEDIUM,
-            "Low": VulnerabilitySeverity.LOW,
-            "Informational": VulnerabilitySeverity.INFO
-        }
-        
-        severity = risk_mapping.get(alert.get("risk", "Low"), VulnerabilitySeverity.LOW)
+        # Only generate a fallback id when ZAP did not send a plugin id
+        plugin_id = alert["pluginId"] if "pluginId" in alert else uuid.uuid4()
+        reference = get("reference")
         
         return {
             "scan_id": scan_id,
-            "vulnerability_id": f"zap_{alert.get('pluginId', uuid.uuid4())}",
-            "severity": severity,
-            "title": alert.get("alert", "Unknown Vulnerability"),
-            "description": alert.get("desc", ""),
-            "solution": alert.get("solution", ""),
-            "references": alert.get("reference", "").split("\n") if alert.get("reference") else [],
-            "affected_url": alert.get("url", ""),
-            "affected_parameter": alert.get("param", ""),
-            "vulnerability_type": alert.get("cweid", ""),
+            "vulnerability_id": f"zap_{plugin_id}",
+            "severity": _ZAP_RISK_MAP.get(get("risk", "Low"), VulnerabilitySeverity.LOW),
+            "title": get("alert", "Unknown Vulnerability"),
+            "description": get("desc", ""),
+            "solution": get("solution", ""),
+            "references": reference.split("\n") if reference else [],
+            "affected_url": get("url", ""),
+            "affected_parameter": get("param", ""),
+            "vulnerability_type": get("cweid", ""),
             "evidence": {
-                "attack": alert.get("attack", ""),
-                "evidence": alert.get("evidence", ""),
-                "other": alert.get("other", "")
+                "attack": get("attack", ""),
+                "evidence": get("evidence", ""),
+                "other": get("other", "")
             },
             "status": VulnerabilityStatus.OPEN,
             "network_accessible": True,
@@ -249,8 +363,14 @@ class ScannerEngine:
         """Execute Nmap scan"""
         logger.info(f"Executing Nmap scan for: {scan.target_url}")
         
+        cache_key = ("nmap", scan.target_url)
+        cached = _scan_result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Reusing cached Nmap results for: {scan.target_url}")
+            return self._stamp_cached_results(cached, scan)
+        
         # Extract domain from URL
-        parsed_url = urlparse(scan.target_url)
+        parsed_url = _parse_target(scan.target_url)
         target_host = parsed_url.netloc
         
         try:
@@ -261,7 +381,6 @@ class ScannerEngine:
             # Simulate some common findings
             if parsed_url.scheme == "http":
                 vulnerabilities.append({
-                    "scan_id": str(scan.id),
                     "vulnerability_id": f"nmap_http_unencrypted",
                     "severity": VulnerabilitySeverity.MEDIUM,
                     "title": "Unencrypted HTTP Traffic",
@@ -274,7 +393,8 @@ class ScannerEngine:
                     "internet_facing": True
                 })
             
-            return vulnerabilities
+            _scan_result_cache[cache_key] = vulnerabilities
+            return self._stamp_cached_results(vulnerabilities, scan)
             
         except Exception as e:
             logger.error(f"Nmap scan failed: {str(e)}")
@@ -284,6 +404,12 @@ class ScannerEngine:
         """Execute Nikto scan"""
         logger.info(f"Executing Nikto scan for: {scan.target_url}")
         
+        cache_key = ("nikto", scan.target_url)
+        cached = _scan_result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Reusing cached Nikto results for: {scan.target_url}")
+            return self._stamp_cached_results(cached, scan)
+        
         try:
             # This is a simplified implementation
             # In production, you would integrate with actual Nikto
@@ -291,7 +417,6 @@ class ScannerEngine:
             
             # Simulate some common web server findings
             vulnerabilities.append({
-                "scan_id": str(scan.id),
                 "vulnerability_id": f"nikto_server_info",
                 "severity": VulnerabilitySeverity.INFO,
                 "title": "Server Information Disclosure",
@@ -304,11 +429,18 @@ class ScannerEngine:
                 "internet_facing": True
             })
             
-            return vulnerabilities
+            _scan_result_cache[cache_key] = vulnerabilities
+            return self._stamp_cached_results(vulnerabilities, scan)
             
         except Exception as e:
             logger.error(f"Nikto scan failed: {str(e)}")
             return []
+    
+    @staticmethod
+    def _stamp_cached_results(results: List[Dict[str, Any]], scan: Scan) -> List[Dict[str, Any]]:
+        """Copy scan-independent findings and attach them to the given scan"""
+        scan_id = str(scan.id)
+        return [{**result, "scan_id": scan_id} for result in results]
 
 
 class ScanJobManager:
@@ -321,10 +453,12 @@ class ScanJobManager:
     async def start_scan_job(self, scan_id: str) -> bool:
         """Start a scan job"""
         try:
-            # Get scan from database
-            from sqlalchemy import select
+            # Get scan from database; the engine only reads these columns and
+            # writes status through UPDATE statements
             result = await self.db.execute(
-                select(Scan).where(Scan.id == scan_id)
+                select(Scan)
+                .options(load_only(Scan.id, Scan.target_url, Scan.scan_types))
+                .where(Scan.id == scan_id)
             )
             scan = result.scalar_one_or_none()
             
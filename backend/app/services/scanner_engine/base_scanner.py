@@ -8,10 +8,14 @@ Defines the common interface and functionality for security scanners.
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Sequence, Tuple
 from datetime import datetime
 import asyncio
 import logging
+import time
+from urllib.parse import urlparse
+
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +43,44 @@ class VulnerabilitySeverity(str, Enum):
     INFO = "info"
 
 
+# Lookup tables shared by every scanner; built once at import
+_SEVERITY_MAP = {
+    'critical': VulnerabilitySeverity.CRITICAL,
+    'high': VulnerabilitySeverity.HIGH,
+    'medium': VulnerabilitySeverity.MEDIUM,
+    'low': VulnerabilitySeverity.LOW,
+    'info': VulnerabilitySeverity.INFO,
+    'informational': VulnerabilitySeverity.INFO,
+    # Add more mappings as needed
+}
+
+_SEVERITY_CVSS = {
+    VulnerabilitySeverity.CRITICAL: 9.0,
+    VulnerabilitySeverity.HIGH: 7.0,
+    VulnerabilitySeverity.MEDIUM: 5.0,
+    VulnerabilitySeverity.LOW: 3.0,
+    VulnerabilitySeverity.INFO: 0.0
+}
+
+_SEVERITY_WEIGHTS = {
+    VulnerabilitySeverity.CRITICAL: 5,
+    VulnerabilitySeverity.HIGH: 4,
+    VulnerabilitySeverity.MEDIUM: 3,
+    VulnerabilitySeverity.LOW: 2,
+    VulnerabilitySeverity.INFO: 1
+}
+
+# Progress updates closer together than this (in seconds and percentage points)
+# are coalesced into the latest one; completion is always reported immediately
+PROGRESS_MIN_INTERVAL = 1.0
+PROGRESS_MIN_STEP = 1.0
+
+# (host, port) pairs recently found reachable, so repeated validations of one target
+# skip the DNS lookup and TCP handshake
+TARGET_PROBE_TIMEOUT = 5.0
+_reachability_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+
+
 @dataclass
 class VulnerabilityData:
     """Data class for vulnerability information"""
@@ -53,21 +95,14 @@ class VulnerabilityData:
     cve_id: Optional[str] = None
     parameter: Optional[str] = None
     references: List[str] = field(default_factory=list)
-    tags: List[str] = field(default_factory=list)
+    tags: Sequence[str] = field(default_factory=list)
     confidence: Optional[str] = None
     risk_description: Optional[str] = None
 
     @property
     def severity_weight(self) -> int:
         """Return numeric weight for severity comparison"""
-        weights = {
-            VulnerabilitySeverity.CRITICAL: 5,
-            VulnerabilitySeverity.HIGH: 4,
-            VulnerabilitySeverity.MEDIUM: 3,
-            VulnerabilitySeverity.LOW: 2,
-            VulnerabilitySeverity.INFO: 1
-        }
-        return weights.get(self.severity, 0)
+        return _SEVERITY_WEIGHTS.get(self.severity, 0)
 
 
 @dataclass
@@ -106,16 +141,59 @@ class BaseScanner(ABC):
         self.progress_callback: Optional[Callable[[float, str], None]] = None
         self.is_running = False
         self.should_stop = False
+        self._last_progress_emit = 0.0
+        self._last_progress_value = -PROGRESS_MIN_STEP
+        self._pending_progress: Optional[Tuple[float, str]] = None
+        self._progress_flush_handle: Optional[asyncio.TimerHandle] = None
         
     def set_progress_callback(self, callback: Callable[[float, str], None]):
         """Set callback function for progress updates"""
         self.progress_callback = callback
     
     def update_progress(self, progress: float, message: str):
-        """Update scan progress"""
+        """
+        Update scan progress.
+        
+        Updates arriving faster than the callback needs them are coalesced: the
+        latest one is held back and emitted once PROGRESS_MIN_INTERVAL has passed,
+        unless a newer update supersedes it first.
+        """
+        wait = PROGRESS_MIN_INTERVAL - (time.monotonic() - self._last_progress_emit)
+        if (
+            progress < 100
+            and wait > 0
+            and abs(progress - self._last_progress_value) < PROGRESS_MIN_STEP
+        ):
+            self._pending_progress = (progress, message)
+            if self._progress_flush_handle is None:
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    # No loop to schedule on; the next update carries the progress forward
+                    return
+                self._progress_flush_handle = loop.call_later(wait, self.flush_progress)
+            return
+        
+        self._emit_progress(progress, message)
+    
+    def flush_progress(self):
+        """Emit the held-back progress update, if any"""
+        if self._pending_progress is not None:
+            self._emit_progress(*self._pending_progress)
+    
+    def _emit_progress(self, progress: float, message: str):
+        """Send a progress update to the callback and the log"""
+        if self._progress_flush_handle is not None:
+            self._progress_flush_handle.cancel()
+            self._progress_flush_handle = None
+        self._pending_progress = None
+        self._last_progress_emit = time.monotonic()
+        self._last_progress_value = progress
+        
         if self.progress_callback:
             self.progress_callback(progress, message)
-        logger.info(f"[{self.scan_type}] Progress: {progress:.1f}% - {message}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"[{self.scan_type}] Progress: {progress:.1f}% - {message}")
     
     def stop(self):
         """Signal the scanner to stop"""
@@ -213,35 +291,41 @@ class BaseScanner(ABC):
     
     def _map_severity(self, raw_severity: str) -> VulnerabilitySeverity:
         """Map raw severity string to VulnerabilitySeverity enum"""
-        severity_map = {
-            'critical': VulnerabilitySeverity.CRITICAL,
-            'high': VulnerabilitySeverity.HIGH,
-            'medium': VulnerabilitySeverity.MEDIUM,
-            'low': VulnerabilitySeverity.LOW,
-            'info': VulnerabilitySeverity.INFO,
-            'informational': VulnerabilitySeverity.INFO,
-            # Add more mappings as needed
-        }
-        return severity_map.get(raw_severity.lower(), VulnerabilitySeverity.INFO)
+        return _SEVERITY_MAP.get(raw_severity.lower(), VulnerabilitySeverity.INFO)
     
     def _calculate_cvss_score(self, severity: VulnerabilitySeverity) -> float:
         """Calculate approximate CVSS score based on severity"""
-        cvss_map = {
-            VulnerabilitySeverity.CRITICAL: 9.0,
-            VulnerabilitySeverity.HIGH: 7.0,
-            VulnerabilitySeverity.MEDIUM: 5.0,
-            VulnerabilitySeverity.LOW: 3.0,
-            VulnerabilitySeverity.INFO: 0.0
-        }
-        return cvss_map.get(severity, 0.0)
+        return _SEVERITY_CVSS.get(severity, 0.0)
     
     async def _validate_target_url(self, target_url: str) -> bool:
-        """Validate if target URL is accessible"""
-        import aiohttp
+        """Validate if target URL is accessible by opening a TCP connection to it"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.head(target_url, timeout=10) as response:
-                    return response.status < 400
+            parsed = urlparse(target_url)
+            host = parsed.hostname
+            port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        except ValueError as e:
+            logger.warning(f"Target URL validation failed: {e}")
+            return False
+        
+        if not host:
+            logger.warning(f"Target URL validation failed: no host in {target_url}")
+            return False
+        
+        key = (host, port)
+        if key in _reachability_cache:
+            return True
+        
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port),
+                timeout=TARGET_PROBE_TIMEOUT
+            )
+            writer.close()
+            await writer.wait_closed()
         except Exception as e:
+            # Failures are not cached so a target that comes back is probed again
             logger.warning(f"Target URL validation failed: {e}")
-            return False
\ No newline at end of file
+            return False
+        
+        _reachability_cache[key] = True
+        return True
\ No newline at end of file
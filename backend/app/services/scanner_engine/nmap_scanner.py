@@ -6,21 +6,142 @@ Provides comprehensive port scanning capabilities and service enumeration.
 """
 
 import asyncio
+import ipaddress
 import json
-import subprocess
-import xml.etree.ElementTree as ET
-from typing import Dict, Any, List, Optional, Union
+import logging
+import shlex
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
+from functools import lru_cache
 from urllib.parse import urlparse
 import tempfile
 import os
 import re
 
+# lxml parses Nmap XML in C; fall back to the stdlib parser (same API) without it
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
+
 from .base_scanner import BaseScanner, ScanResult, ScanType, VulnerabilityData, VulnerabilitySeverity
 from app.core.logging_simple import get_logger
 
 logger = get_logger(__name__)
 
+# Bytes read from Nmap's stdout per parser feed
+NMAP_READ_CHUNK_SIZE = 65536
+
+# Greppable (-oG) output: "Host: <addr> (<name>)\t...", and within the Ports field
+# "<port>/<state>/<protocol>/<owner>/<service>/<rpc info>/<version>/" entries
+_GREP_HOST_RE = re.compile(r"Host: (\S+) \(([^)]*)\)")
+_GREP_PORTS_RE = re.compile(r"\tPorts: ([^\t]*)")
+_GREP_PORT_RE = re.compile(r"(\d+)/([^/]*)/([^/]*)/[^/]*/([^/]*)/[^/]*/([^/]*)/")
+
+# Seconds Nmap gets to exit after SIGTERM (it prints final stats) before SIGKILL
+NMAP_TERMINATE_GRACE = 2.0
+
+# Nmap flag for each supported scan technique
+_SCAN_TECHNIQUE_FLAGS = {
+    "tcp_syn": "-sS",
+    "tcp_connect": "-sT",
+    "udp": "-sU",
+    "tcp_ack": "-sA",
+    "tcp_fin": "-sF"
+}
+
+# Port risk classification, used for every open port
+_HIGH_RISK_PORTS = frozenset({21, 23, 25, 53, 135, 139, 445, 1433, 1521, 3306, 3389, 5432})
+_MEDIUM_RISK_PORTS = frozenset({22, 80, 110, 143, 443, 993, 995})
+_DANGEROUS_SERVICES = ("telnet", "ftp", "rsh", "rlogin", "netbios", "smb")
+
+_PORT_REMEDIATION = {
+    21: "Replace FTP with SFTP or FTPS for secure file transfer",
+    22: "SSH is relatively secure, ensure strong authentication and latest version",
+    23: "Replace Telnet with SSH for secure remote access",
+    25: "Secure SMTP configuration and prevent open relay",
+    53: "Secure DNS server configuration and restrict zone transfers",
+    80: "Consider using HTTPS instead of HTTP for web traffic",
+    110: "Use secure POP3S or IMAP over TLS instead of plain POP3",
+    135: "Windows RPC - restrict access and apply latest security patches",
+    139: "NetBIOS - disable if not needed, restrict network access",
+    143: "Use IMAP over TLS instead of plain IMAP",
+    443: "HTTPS is secure, ensure proper TLS configuration",
+    445: "SMB - ensure latest patches and restrict network access",
+    993: "IMAPS - secure, verify TLS configuration",
+    995: "POP3S - secure, verify TLS configuration",
+    1433: "MSSQL - restrict network access and use SQL authentication",
+    1521: "Oracle DB - restrict network access and secure configuration",
+    3306: "MySQL - restrict network access and secure configuration",
+    3389: "RDP - use strong authentication and restrict network access",
+    5432: "PostgreSQL - restrict network access and secure configuration"
+}
+
+# Severity of NSE scripts that report known vulnerabilities
+_SCRIPT_SEVERITY = {
+    "http-sql-injection": VulnerabilitySeverity.HIGH,
+    "http-xssed": VulnerabilitySeverity.HIGH,
+    "http-csrf": VulnerabilitySeverity.MEDIUM,
+    "http-slowloris-check": VulnerabilitySeverity.MEDIUM,
+    "smb-vuln-ms17-010": VulnerabilitySeverity.CRITICAL,
+    "smb-vuln-ms08-067": VulnerabilitySeverity.CRITICAL,
+    "ssl-poodle": VulnerabilitySeverity.MEDIUM,
+    "ssl-heartbleed": VulnerabilitySeverity.HIGH
+}
+
+# Script output wording that indicates an actual finding
+_SCRIPT_FINDING_RE = re.compile(r"vulnerable|found|detected|exposed", re.IGNORECASE)
+
+# Finding tags are immutable tuples, built once per distinct value and shared
+# by every finding that carries them
+_OS_DETECTION_TAGS = ("os-detection", "fingerprinting")
+
+
+@lru_cache(maxsize=None)
+def _port_tags(protocol: str) -> Tuple[str, ...]:
+    """Tags for an open port finding"""
+    return ("port-scan", "network", protocol)
+
+
+@lru_cache(maxsize=1024)
+def _script_tags(script_id: str) -> Tuple[str, ...]:
+    """Tags for an NSE script finding"""
+    return ("script-scan", "nmap", script_id)
+
+
+@dataclass(slots=True)
+class PortInfo:
+    """A port reported by Nmap, as parsed from its XML output"""
+    port: Optional[int]
+    protocol: Optional[str]
+    state: Optional[str] = None
+    service: Optional[Dict[str, Any]] = None
+    version: Optional[str] = None
+    scripts: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@lru_cache(maxsize=1024)
+def _extract_host(target_url: str) -> str:
+    """Hostname/IP of a target URL or plain host[:port], without the port"""
+    if "://" in target_url:
+        parsed = urlparse(target_url)
+        return parsed.netloc.split(':')[0]
+    else:
+        return target_url.split(':')[0]
+
+
+@lru_cache(maxsize=1024)
+def _is_ip_address(host: str) -> bool:
+    """Whether a target host is an IP literal rather than a name Nmap has to resolve"""
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
 
 class NmapScanner(BaseScanner):
     """
@@ -55,6 +176,14 @@ class NmapScanner(BaseScanner):
         
         # Output format
         self.output_format = self.config.get("output_format", "xml")
+        
+        # First line of `nmap --version`, probed once per scanner
+        self._version_line: Optional[str] = None
+        
+        # Option-derived part of the Nmap command, rebuilt when the options change
+        self._argv_template: List[str] = []
+        self._output_mode = "xml"
+        self._rebuild_argv_template()
     
     async def configure(self, options: Dict[str, Any]) -> bool:
         """Configure Nmap scanner with specific options"""
@@ -93,6 +222,8 @@ class NmapScanner(BaseScanner):
             if "script_categories" in options:
                 self.script_categories = options["script_categories"]
             
+            self._rebuild_argv_template()
+            
             logger.info("Nmap scanner configured successfully")
             return True
             
@@ -103,12 +234,8 @@ class NmapScanner(BaseScanner):
     async def validate_target(self, target_url: str) -> bool:
         """Validate if target is suitable for Nmap scanning"""
         try:
-            # Extract hostname/IP from URL
-            if "://" in target_url:
-                parsed = urlparse(target_url)
-                target_host = parsed.netloc.split(':')[0]  # Remove port if present
-            else:
-                target_host = target_url.split(':')[0]  # Handle plain hostname/IP
+            # Extract hostname/IP from URL (cached, so scan() does not parse it again)
+            target_host = self._extract_host_from_url(target_url)
             
             # Basic validation - check if it looks like a hostname or IP
             if not target_host or len(target_host) < 1:
@@ -118,22 +245,20 @@ class NmapScanner(BaseScanner):
             # Check if target is reachable with a simple ping test
             try:
                 # Try to resolve hostname or ping IP
-                result = subprocess.run(
+                returncode, _ = await self._run_command(
                     ["ping", "-c", "1", "-W", "3", target_host] if os.name != 'nt' else ["ping", "-n", "1", "-w", "3000", target_host],
-                    capture_output=True,
-                    text=True,
                     timeout=10
                 )
                 
-                if result.returncode == 0:
-                    logger.info(f"Target {target_host} is reachable")
+                if returncode == 0:
+                    logger.info("Target %s is reachable", target_host)
                 else:
-                    logger.warning(f"Target {target_host} may not be reachable, but continuing scan")
+                    logger.warning("Target %s may not be reachable, but continuing scan", target_host)
                     
-            except subprocess.TimeoutExpired:
+            except asyncio.TimeoutError:
                 logger.warning("Ping timeout, but continuing with scan")
             
-            logger.info(f"Target validated for Nmap scan: {target_host}")
+            logger.info("Target validated for Nmap scan: %s", target_host)
             return True
             
         except Exception as e:
@@ -142,21 +267,22 @@ class NmapScanner(BaseScanner):
     
     async def health_check(self) -> bool:
         """Check if Nmap is installed and accessible"""
+        if self._version_line is not None:
+            return True
+        
         try:
             # Check if nmap is available
-            result = subprocess.run(
+            returncode, stdout = await self._run_command(
                 [self.nmap_executable, "--version"],
-                capture_output=True,
-                text=True,
                 timeout=10
             )
             
-            if result.returncode == 0:
-                version_info = result.stdout.split('\n')[0]
-                logger.info(f"Nmap health check passed - {version_info}")
+            if returncode == 0:
+                self._version_line = stdout.split('\n')[0]
+                logger.info("Nmap health check passed - %s", self._version_line)
                 return True
             else:
-                logger.error(f"Nmap health check failed - return code: {result.returncode}")
+                logger.error(f"Nmap health check failed - return code: {returncode}")
                 return False
                 
         except FileNotFoundError:
@@ -166,6 +292,21 @@ class NmapScanner(BaseScanner):
             logger.error(f"Nmap health check error: {str(e)}")
             return False
     
+    async def _run_command(self, command: List[str], timeout: float) -> Tuple[int, str]:
+        """Run an external command without blocking the event loop; returns (returncode, stdout)"""
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode, stdout.decode('utf-8', errors='ignore')
+    
     async def scan(self, target_url: str, options: Dict[str, Any] = None) -> ScanResult:
         """Perform Nmap port scan"""
         start_time = datetime.utcnow()
@@ -173,16 +314,23 @@ class NmapScanner(BaseScanner):
             scan_type=self.scan_type,
             target_url=target_url,
             status="running",
-            start_time=start_time,
-            metadata={"nmap_version": await self._get_nmap_version()}
+            start_time=start_time
         )
         
         try:
             self.is_running = True
             self.update_progress(0, "Initializing Nmap scan")
             
+            # The Nmap probe and the target ping are independent; run them concurrently
+            healthy, target_valid = await asyncio.gather(
+                self.health_check(),
+                self.validate_target(target_url)
+            )
+            # Answered from the health check's probe, without another fork
+            scan_result.metadata["nmap_version"] = await self._get_nmap_version()
+            
             # Health check
-            if not await self.health_check():
+            if not healthy:
                 raise Exception("Nmap is not accessible")
             
             # Configure scan options
@@ -190,7 +338,7 @@ class NmapScanner(BaseScanner):
                 await self.configure(options)
             
             # Validate and extract target
-            if not await self.validate_target(target_url):
+            if not target_valid:
                 raise Exception("Target validation failed")
             
             target_host = self._extract_host_from_url(target_url)
@@ -198,18 +346,19 @@ class NmapScanner(BaseScanner):
             self.update_progress(10, f"Starting port scan of {target_host}")
             
             # Build and execute Nmap command
-            nmap_command = self._build_nmap_command(target_host, options or {})
+            nmap_command = self._build_nmap_command([target_host], options or {})
             
             self.update_progress(20, "Executing Nmap scan...")
             
-            # Execute scan
-            scan_output = await self._execute_nmap_scan(nmap_command)
+            # Execute scan; its XML output is parsed as it streams in
+            scan_output, hosts = await self._execute_nmap_scan(nmap_command)
+            parsed_results = hosts[0]
+            parsed_results["host"] = target_host
             
-            self.update_progress(80, "Parsing scan results...")
+            self.update_progress(80, "Processing scan results...")
             
-            # Parse results
-            parsed_results = await self._parse_nmap_output(scan_output, target_host)
-            vulnerabilities = self._convert_to_vulnerabilities(parsed_results, target_host)
+            # Convert results
+            vulnerabilities, counters = self._convert_to_vulnerabilities(parsed_results, target_host)
             
             # Update scan result
             end_time = datetime.utcnow()
@@ -217,13 +366,12 @@ class NmapScanner(BaseScanner):
             scan_result.duration_seconds = (end_time - start_time).total_seconds()
             scan_result.status = "completed"
             scan_result.vulnerabilities = vulnerabilities
-            scan_result.raw_output = scan_output
+            scan_result.raw_output = scan_output.decode('utf-8', errors='ignore')
             scan_result.metadata.update({
                 "target_host": target_host,
                 "ports_scanned": self.default_ports,
                 "scan_techniques": self.scan_techniques,
-                "open_ports": len([v for v in vulnerabilities if "open port" in v.title.lower()]),
-                "services_detected": len([v for v in vulnerabilities if "service detected" in v.title.lower()])
+                **counters
             })
             
             self.update_progress(100, f"Scan completed - {len(vulnerabilities)} findings")
@@ -241,37 +389,131 @@ class NmapScanner(BaseScanner):
             
         return scan_result
     
+    async def scan_many(self, target_urls: List[str], options: Dict[str, Any] = None) -> List[ScanResult]:
+        """
+        Scan several targets with a single Nmap process.
+        
+        The hosts are passed to Nmap as an input list (-iL), so the process start-up
+        and NSE initialisation are paid once instead of once per target.
+        
+        Args:
+            target_urls: The target URLs to scan
+            options: Optional scan-specific options, shared by every target
+            
+        Returns:
+            List[ScanResult]: One result per target URL, in the same order
+        """
+        if len(target_urls) <= 1:
+            return [await self.scan(target_url, options) for target_url in target_urls]
+        
+        start_time = datetime.utcnow()
+        nmap_version = await self._get_nmap_version()
+        scan_results = [
+            ScanResult(
+                scan_type=self.scan_type,
+                target_url=target_url,
+                status="running",
+                start_time=start_time,
+                metadata={"nmap_version": nmap_version}
+            )
+            for target_url in target_urls
+        ]
+        target_hosts = [self._extract_host_from_url(target_url) for target_url in target_urls]
+        hosts_path = None
+        
+        try:
+            self.is_running = True
+            self.update_progress(0, f"Initializing Nmap scan of {len(target_urls)} targets")
+            
+            if not await self.health_check():
+                raise Exception("Nmap is not accessible")
+            
+            # Configure scan options
+            if options:
+                await self.configure(options)
+            
+            # Write the distinct hosts to Nmap's input list
+            with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as hosts_file:
+                hosts_file.write("\n".join(dict.fromkeys(host for host in target_hosts if host)))
+                hosts_path = hosts_file.name
+            
+            nmap_command = self._build_nmap_command(["-iL", hosts_path], options or {})
+            if self._output_mode == "grep" and not all(_is_ip_address(host) for host in target_hosts if host):
+                # Greppable output names hosts only by address (-n drops reverse DNS),
+                # so hostname targets need the XML <hostname type="user"> to be matched
+                nmap_command = ["-oX" if arg == "-oG" else arg for arg in nmap_command]
+            
+            self.update_progress(20, "Executing Nmap scan...")
+            
+            scan_output, hosts = await self._execute_nmap_scan(nmap_command, max_hosts=None)
+            
+            self.update_progress(80, "Processing scan results...")
+            
+            raw_output = scan_output.decode('utf-8', errors='ignore')
+            
+            # Nmap reports each host by address and by the name it was given
+            hosts_by_name = {name: host for host in hosts for name in host["names"]}
+            end_time = datetime.utcnow()
+            
+            for scan_result, target_host in zip(scan_results, target_hosts):
+                scan_result.end_time = end_time
+                scan_result.duration_seconds = (end_time - start_time).total_seconds()
+                
+                parsed_results = hosts_by_name.get(target_host)
+                if parsed_results is None:
+                    scan_result.status = "failed"
+                    scan_result.error_message = f"Nmap reported no results for {target_host or scan_result.target_url}"
+                    continue
+                
+                parsed_results["host"] = target_host
+                vulnerabilities, counters = self._convert_to_vulnerabilities(parsed_results, target_host)
+                
+                scan_result.status = "completed"
+                scan_result.vulnerabilities = vulnerabilities
+                scan_result.raw_output = raw_output
+                scan_result.metadata.update({
+                    "target_host": target_host,
+                    "ports_scanned": self.default_ports,
+                    "scan_techniques": self.scan_techniques,
+                    **counters
+                })
+            
+            self.update_progress(100, f"Scan completed - {len(hosts)} hosts reported")
+            
+        except Exception as e:
+            logger.error(f"Nmap batch scan error: {str(e)}")
+            end_time = datetime.utcnow()
+            for scan_result in scan_results:
+                if scan_result.status == "running":
+                    scan_result.status = "failed"
+                    scan_result.error_message = str(e)
+                    scan_result.end_time = end_time
+                    scan_result.duration_seconds = (end_time - start_time).total_seconds()
+        
+        finally:
+            self.is_running = False
+            if hosts_path:
+                os.unlink(hosts_path)
+        
+        return scan_results
+    
     def _extract_host_from_url(self, target_url: str) -> str:
         """Extract hostname/IP from URL"""
-        if "://" in target_url:
-            parsed = urlparse(target_url)
-            return parsed.netloc.split(':')[0]
-        else:
-            return target_url.split(':')[0]
+        return _extract_host(target_url)
     
-    def _build_nmap_command(self, target_host: str, options: Dict[str, Any]) -> List[str]:
-        """Build Nmap command with appropriate options"""
+    def _rebuild_argv_template(self):
+        """Precompute the Nmap arguments that depend only on scanner options"""
         command = [self.nmap_executable]
         
         # Timing template
-        command.extend([f"-T{self.timing_template}"])
+        command.append(f"-T{self.timing_template}")
         
         # Scan techniques
-        for technique in self.scan_techniques:
-            if technique == "tcp_syn":
-                command.append("-sS")
-            elif technique == "tcp_connect":
-                command.append("-sT") 
-            elif technique == "udp":
-                command.append("-sU")
-            elif technique == "tcp_ack":
-                command.append("-sA")
-            elif technique == "tcp_fin":
-                command.append("-sF")
-        
-        # Port specification
-        ports = options.get("ports", self.default_ports)
-        command.extend(["-p", ports])
+        command.extend(
+            _SCAN_TECHNIQUE_FLAGS[technique]
+            for technique in self.scan_techniques
+            if technique in _SCAN_TECHNIQUE_FLAGS
+        )
         
         # Service detection
         if self.enable_service_detection:
@@ -290,9 +532,23 @@ class NmapScanner(BaseScanner):
             script_args = ",".join(self.script_categories)
             command.extend(["--script", script_args])
         
-        # Output format
+        # Output format. A plain port scan (no -sV, -sC, -O or scripts) only needs each
+        # port's state and service name, so the much smaller greppable format is used.
+        # Greppable output merges product, version and extra info into one field, so
+        # any service or version detection keeps XML.
+        self._output_mode = "xml"
         if self.output_format == "xml":
-            command.append("-oX")
+            plain_port_scan = not (
+                self.enable_service_detection
+                or self.enable_version_detection
+                or self.enable_os_detection
+                or (self.enable_scripts and self.script_categories)
+            )
+            if plain_port_scan:
+                self._output_mode = "grep"
+                command.append("-oG")
+            else:
+                command.append("-oX")
             command.append("-")  # Output to stdout
         
         # Disable DNS resolution for faster scanning
@@ -301,14 +557,33 @@ class NmapScanner(BaseScanner):
         # Disable ping
         command.append("-Pn")
         
-        # Target
-        command.append(target_host)
+        self._argv_template = command
+    
+    def _build_nmap_command(self, target_args: List[str], options: Dict[str, Any]) -> List[str]:
+        """Build Nmap command with appropriate options; target_args is a host or an input list (-iL)"""
+        # Port specification and targets are the only per-scan arguments
+        command = [*self._argv_template, "-p", options.get("ports", self.default_ports), *target_args]
         
-        logger.info(f"Nmap command: {' '.join(command)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Nmap command: %s", shlex.join(command))
         return command
     
-    async def _execute_nmap_scan(self, command: List[str]) -> str:
-        """Execute Nmap scan command asynchronously"""
+    async def _execute_nmap_scan(self, command: List[str], max_hosts: Optional[int] = 1) -> Tuple[bytes, List[Dict[str, Any]]]:
+        """
+        Execute Nmap scan command asynchronously, parsing its XML output as it streams in.
+        
+        Returns the raw output bytes and one results dict per reported host. Parsing stops
+        after max_hosts hosts (None parses them all); if no host is reported, the
+        list holds a single empty results dict.
+        """
+        hosts = [self._new_host_results()]
+        parser = ET.XMLPullParser(events=("end",))
+        chunks: List[bytes] = []
+        # Greppable output is parsed once the scan is done; it is a line per host
+        grep_output = "-oG" in command
+        parsing = not grep_output
+        parse_failed = False
+        
         try:
             # Start process
             process = await asyncio.create_subprocess_exec(
@@ -316,166 +591,297 @@ class NmapScanner(BaseScanner):
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
-            
-            # Wait for completion with timeout
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=self.max_scan_duration
-                )
-            except asyncio.TimeoutError:
-                # Kill process if timeout
-                process.terminate()
+            # Drain stderr alongside stdout so a chatty Nmap cannot block on a full pipe
+            stderr_task = asyncio.ensure_future(process.stderr.read())
+            
+            async def consume_stdout():
+                nonlocal parsing, parse_failed
+                while True:
+                    chunk = await process.stdout.read(NMAP_READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    
+                    if parsing:
+                        try:
+                            parsing = self._feed_nmap_xml(parser, chunk, hosts, max_hosts)
+                        except Exception as e:
+                            logger.error(f"Error parsing Nmap XML output: {str(e)}")
+                            parsing = False
+                            parse_failed = True
+                
                 await process.wait()
-                raise Exception("Nmap scan timeout")
             
+            try:
+                # Wait for completion with timeout
+                try:
+                    await asyncio.wait_for(consume_stdout(), timeout=self.max_scan_duration)
+                except asyncio.TimeoutError:
+                    raise Exception("Nmap scan timeout")
+                
+                stderr = await stderr_task
+            finally:
+                # On timeout or cancellation Nmap is still running; stop and reap it
+                if process.returncode is None:
+                    await self._stop_process(process)
+                stderr_task.cancel()
             if process.returncode != 0 and stderr:
-                error_msg = stderr.decode('utf-8', errors='ignore')
-                logger.warning(f"Nmap stderr: {error_msg}")
+                logger.warning("Nmap stderr: %s", stderr.decode('utf-8', errors='ignore'))
             
-            output = stdout.decode('utf-8', errors='ignore')
+            # Kept as bytes; decoded only where the text is stored
+            output = b"".join(chunks)
             
             if not output.strip():
                 raise Exception("Nmap produced no output")
             
-            return output
-            
         except Exception as e:
             logger.error(f"Error executing Nmap scan: {str(e)}")
             raise
+        
+        if grep_output:
+            return output, self._parse_grep_output(output, max_hosts)
+        
+        if parsing:
+            # Closing surfaces truncated XML
+            try:
+                parser.close()
+            except Exception as e:
+                logger.error(f"Error parsing Nmap XML output: {str(e)}")
+                parse_failed = True
+        
+        if parsing or parse_failed:
+            # Drop the host still in progress unless it is all there is to report
+            in_progress = hosts.pop()
+            if parse_failed:
+                # Keep the text output when the XML could not be parsed
+                in_progress["raw_text"] = output.decode('utf-8', errors='ignore')
+            if not hosts:
+                if not parse_failed:
+                    logger.warning("No host information found in Nmap output")
+                hosts.append(in_progress)
+        
+        return output, hosts
+    
+    async def _stop_process(self, process: asyncio.subprocess.Process):
+        """Terminate a process, escalating to kill if it does not exit within the grace period"""
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=NMAP_TERMINATE_GRACE)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
     
-    async def _parse_nmap_output(self, output: str, target_host: str) -> Dict[str, Any]:
-        """Parse Nmap XML output"""
-        results = {
-            "host": target_host,
+    def _new_host_results(self) -> Dict[str, Any]:
+        """Empty parsed results for one Nmap host"""
+        return {
+            "host": None,
+            "names": [],
             "ports": [],
+            "closed_ports": 0,
             "services": [],
             "scripts": [],
             "os_detection": None
         }
-        
-        try:
-            # Parse XML
-            root = ET.fromstring(output)
-            
-            # Find host information
-            host_elem = root.find(".//host")
-            if host_elem is None:
-                logger.warning("No host information found in Nmap output")
-                return results
-            
-            # Parse ports
-            ports_elem = host_elem.find("ports")
-            if ports_elem is not None:
-                for port_elem in ports_elem.findall("port"):
-                    port_info = {
-                        "port": port_elem.get("portid"),
-                        "protocol": port_elem.get("protocol"),
-                        "state": None,
-                        "service": None,
-                        "version": None,
-                        "scripts": []
-                    }
-                    
-                    # Port state
-                    state_elem = port_elem.find("state")
-                    if state_elem is not None:
-                        port_info["state"] = state_elem.get("state")
+    
+    def _parse_grep_output(self, output: bytes, max_hosts: Optional[int]) -> List[Dict[str, Any]]:
+        """Parse Nmap greppable (-oG) output into the same per-host results as the XML parser"""
+        hosts_by_address: Dict[str, Dict[str, Any]] = {}
+        
+        for line in output.decode('utf-8', errors='ignore').splitlines():
+            match = _GREP_HOST_RE.match(line)
+            if match is None:
+                continue
+            
+            # A host is reported on several lines (status, then ports)
+            address, hostname = match.group(1), match.group(2)
+            results = hosts_by_address.get(address)
+            if results is None:
+                if max_hosts is not None and len(hosts_by_address) >= max_hosts:
+                    break
+                results = self._new_host_results()
+                results["names"].append(address)
+                if hostname:
+                    results["names"].append(hostname)
+                hosts_by_address[address] = results
+            
+            ports_match = _GREP_PORTS_RE.search(line)
+            if ports_match is None:
+                continue
+            
+            for port, state, protocol, service, version in _GREP_PORT_RE.findall(ports_match.group(1)):
+                if state != "open":
+                    results["closed_ports"] += 1
+                    continue
+                # -oG reports product, version and extra info as one string
+                results["ports"].append(PortInfo(
+                    port=int(port),
+                    protocol=protocol,
+                    state=state,
+                    service={"name": service, "product": version or None, "version": None, "extrainfo": None} if service else None
+                ))
+        
+        if not hosts_by_address:
+            logger.warning("No host information found in Nmap output")
+            return [self._new_host_results()]
+        
+        return list(hosts_by_address.values())
+    
+    def _feed_nmap_xml(self, parser: Any, data: bytes, hosts: List[Dict[str, Any]], max_hosts: Optional[int]) -> bool:
+        """Feed a chunk of Nmap XML to the pull parser and record completed ports.
+        
+        hosts[-1] is the host being parsed; a new one is appended as each host
+        completes. Returns False once max_hosts hosts are complete and no more
+        input is needed.
+        """
+        results = hosts[-1]
+        parser.feed(data)
+        for _, elem in parser.read_events():
+            tag = elem.tag
+            
+            if tag == "port":
+                # Port state; only open ports are reported, the rest are just counted
+                state_elem = elem.find("state")
+                state = state_elem.attrib.get("state") if state_elem is not None else None
+                
+                if state == "open":
+                    # Read attributes from each element's attribute mapping once
+                    port_attrs = elem.attrib
+                    portid = port_attrs.get("portid")
+                    port_info = PortInfo(
+                        port=int(portid) if portid else None,
+                        protocol=port_attrs.get("protocol"),
+                        state=state
+                    )
                     
                     # Service information
-                    service_elem = port_elem.find("service")
+                    service_elem = elem.find("service")
                     if service_elem is not None:
-                        port_info["service"] = {
-                            "name": service_elem.get("name"),
-                            "product": service_elem.get("product"),
-                            "version": service_elem.get("version"),
-                            "extrainfo": service_elem.get("extrainfo")
+                        service_attrs = service_elem.attrib
+                        port_info.service = {
+                            "name": service_attrs.get("name"),
+                            "product": service_attrs.get("product"),
+                            "version": service_attrs.get("version"),
+                            "extrainfo": service_attrs.get("extrainfo")
                         }
                     
                     # Script results
-                    for script_elem in port_elem.findall("script"):
-                        script_info = {
-                            "id": script_elem.get("id"),
-                            "output": script_elem.get("output")
-                        }
-                        port_info["scripts"].append(script_info)
+                    port_info.scripts = [
+                        {"id": script_attrs.get("id"), "output": script_attrs.get("output")}
+                        for script_attrs in (script_elem.attrib for script_elem in elem.iterfind("script"))
+                    ]
                     
                     results["ports"].append(port_info)
-            
-            # Parse OS detection
-            os_elem = host_elem.find("os")
-            if os_elem is not None:
-                osmatch_elem = os_elem.find("osmatch")
-                if osmatch_elem is not None:
-                    results["os_detection"] = {
-                        "name": osmatch_elem.get("name"),
-                        "accuracy": osmatch_elem.get("accuracy")
-                    }
-            
-        except ET.ParseError as e:
-            logger.error(f"Error parsing Nmap XML output: {str(e)}")
-            # Try to parse as text output
-            results["raw_text"] = output
-        except Exception as e:
-            logger.error(f"Error processing Nmap output: {str(e)}")
-            results["raw_text"] = output
-        
-        return results
+                else:
+                    results["closed_ports"] += 1
+                
+                elem.clear()
+                if LXML_AVAILABLE:
+                    # Also drop the cleared siblings still referenced by <ports>
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+            
+            # OS detection (best match comes first)
+            elif tag == "osmatch" and results["os_detection"] is None:
+                osmatch_attrs = elem.attrib
+                results["os_detection"] = {
+                    "name": osmatch_attrs.get("name"),
+                    "accuracy": osmatch_attrs.get("accuracy")
+                }
+            
+            # Names the host is reported under
+            elif tag == "address":
+                results["names"].append(elem.attrib.get("addr"))
+            elif tag == "hostname":
+                results["names"].append(elem.attrib.get("name"))
+            
+            # Host discovery hints precede the host and carry their own addresses
+            elif tag == "hosthint":
+                results["names"].clear()
+            
+            elif tag == "host":
+                if max_hosts is not None and len(hosts) >= max_hosts:
+                    return False
+                elem.clear()
+                if LXML_AVAILABLE:
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+                results = self._new_host_results()
+                hosts.append(results)
+        
+        return True
     
-    def _convert_to_vulnerabilities(self, parsed_results: Dict[str, Any], target_host: str) -> List[VulnerabilityData]:
-        """Convert parsed Nmap results to vulnerability data"""
+    def _convert_to_vulnerabilities(self, parsed_results: Dict[str, Any], target_host: str) -> Tuple[List[VulnerabilityData], Dict[str, int]]:
+        """Convert parsed Nmap results to vulnerability data.
+        
+        Also returns the open port and detected service counts for the scan metadata.
+        """
         vulnerabilities = []
+        open_ports = 0
+        services_detected = 0
         
         try:
-            # Process open ports
+            # Process open ports (the parser only keeps open ones)
             for port_info in parsed_results.get("ports", []):
-                if port_info.get("state") == "open":
-                    port_num = port_info.get("port")
-                    protocol = port_info.get("protocol", "tcp")
-                    service_info = port_info.get("service", {})
-                    
-                    # Create vulnerability for open port
-                    title = f"Open Port {port_num}/{protocol.upper()}"
-                    description = f"Port {port_num} is open on {target_host}"
-                    
-                    if service_info and service_info.get("name"):
-                        service_name = service_info.get("name")
-                        title += f" - {service_name}"
-                        description += f" running {service_name}"
-                        
-                        if service_info.get("product"):
-                            product = service_info.get("product")
-                            description += f" ({product}"
-                            
-                            if service_info.get("version"):
-                                version = service_info.get("version")
-                                description += f" {version}"
-                            
-                            description += ")"
+                open_ports += 1
+                port_num = port_info.port
+                protocol = port_info.protocol or "tcp"
+                service_info = port_info.service or {}
+                
+                # Create vulnerability for open port
+                service_name = service_info.get("name")
+                if service_name:
+                    services_detected += 1
+                    product = service_info.get("product")
+                    version = service_info.get("version")
                     
-                    # Determine severity based on port and service
-                    severity = self._assess_port_severity(port_num, service_info)
+                    if product and version:
+                        service_desc = f" running {service_name} ({product} {version})"
+                    elif product:
+                        service_desc = f" running {service_name} ({product})"
+                    else:
+                        service_desc = f" running {service_name}"
                     
-                    vuln = VulnerabilityData(
-                        vulnerability_id=f"nmap_port_{target_host}_{port_num}_{protocol}",
-                        title=title,
-                        description=description,
-                        severity=severity,
-                        solution=self._get_port_remediation(port_num, service_info),
-                        affected_url=f"{target_host}:{port_num}",
-                        evidence={"port_info": port_info, "service": service_info},
-                        tags=["port-scan", "network", protocol]
+                    title = f"Open Port {port_num}/{protocol.upper()} - {service_name}"
+                else:
+                    service_desc = ""
+                    title = f"Open Port {port_num}/{protocol.upper()}"
+                
+                description = f"Port {port_num} is open on {target_host}{service_desc}"
+                
+                # Determine severity based on port and service
+                severity = self._assess_port_severity(port_num, service_info)
+                
+                vuln = VulnerabilityData(
+                    vulnerability_id=f"nmap_port_{target_host}_{port_num}_{protocol}",
+                    title=title,
+                    description=description,
+                    severity=severity,
+                    solution=self._get_port_remediation(port_num, service_info),
+                    affected_url=f"{target_host}:{port_num}",
+                    evidence={
+                        # Fields listed directly; asdict() would deep-copy every nested dict
+                        "port_info": {
+                            "port": port_num,
+                            "protocol": port_info.protocol,
+                            "state": port_info.state,
+                            "service": port_info.service,
+                            "version": port_info.version,
+                            "scripts": port_info.scripts,
+                        },
+                        "service": service_info
+                    },
+                    tags=_port_tags(protocol)
+                )
+                
+                vulnerabilities.append(vuln)
+                
+                # Process script results for this port
+                for script_info in port_info.scripts:
+                    script_vuln = self._process_script_result(
+                        script_info, target_host, port_num, protocol
                     )
-                    
-                    vulnerabilities.append(vuln)
-                    
-                    # Process script results for this port
-                    for script_info in port_info.get("scripts", []):
-                        script_vuln = self._process_script_result(
-                            script_info, target_host, port_num, protocol
-                        )
-                        if script_vuln:
-                            vulnerabilities.append(script_vuln)
+                    if script_vuln:
+                        vulnerabilities.append(script_vuln)
             
             # Process OS detection
             if parsed_results.get("os_detection"):
@@ -488,65 +894,36 @@ class NmapScanner(BaseScanner):
                     solution="This is informational only. Review system configuration if OS disclosure is a concern.",
                     affected_url=target_host,
                     evidence={"os_info": os_info},
-                    tags=["os-detection", "fingerprinting"]
+                    tags=_OS_DETECTION_TAGS
                 )
                 vulnerabilities.append(vuln)
             
         except Exception as e:
             logger.error(f"Error converting Nmap results to vulnerabilities: {str(e)}")
         
-        return vulnerabilities
+        return vulnerabilities, {
+            "open_ports": open_ports,
+            "closed_ports": parsed_results.get("closed_ports", 0),
+            "services_detected": services_detected
+        }
     
-    def _assess_port_severity(self, port: str, service_info: Dict[str, Any]) -> VulnerabilitySeverity:
+    def _assess_port_severity(self, port_num: int, service_info: Dict[str, Any]) -> VulnerabilitySeverity:
         """Assess severity of open port based on port number and service"""
-        port_num = int(port)
         service_name = service_info.get("name", "").lower()
         
-        # High-risk ports
-        high_risk_ports = [21, 23, 25, 53, 135, 139, 445, 1433, 1521, 3306, 3389, 5432]
-        
-        # Medium-risk ports  
-        medium_risk_ports = [22, 80, 110, 143, 443, 993, 995]
-        
-        # Check for dangerous services
-        dangerous_services = ["telnet", "ftp", "rsh", "rlogin", "netbios", "smb"]
-        
-        if port_num in high_risk_ports or any(svc in service_name for svc in dangerous_services):
+        if port_num in _HIGH_RISK_PORTS or any(svc in service_name for svc in _DANGEROUS_SERVICES):
             return VulnerabilitySeverity.HIGH
-        elif port_num in medium_risk_ports:
+        elif port_num in _MEDIUM_RISK_PORTS:
             return VulnerabilitySeverity.MEDIUM
         else:
             return VulnerabilitySeverity.LOW
     
-    def _get_port_remediation(self, port: str, service_info: Dict[str, Any]) -> str:
+    def _get_port_remediation(self, port_num: int, service_info: Dict[str, Any]) -> str:
         """Get remediation advice for open port"""
-        port_num = int(port)
         service_name = service_info.get("name", "").lower()
         
-        remediation_map = {
-            21: "Replace FTP with SFTP or FTPS for secure file transfer",
-            22: "SSH is relatively secure, ensure strong authentication and latest version",
-            23: "Replace Telnet with SSH for secure remote access",
-            25: "Secure SMTP configuration and prevent open relay",
-            53: "Secure DNS server configuration and restrict zone transfers",
-            80: "Consider using HTTPS instead of HTTP for web traffic",
-            110: "Use secure POP3S or IMAP over TLS instead of plain POP3",
-            135: "Windows RPC - restrict access and apply latest security patches",
-            139: "NetBIOS - disable if not needed, restrict network access",
-            143: "Use IMAP over TLS instead of plain IMAP",
-            443: "HTTPS is secure, ensure proper TLS configuration",
-            445: "SMB - ensure latest patches and restrict network access",
-            993: "IMAPS - secure, verify TLS configuration",
-            995: "POP3S - secure, verify TLS configuration",
-            1433: "MSSQL - restrict network access and use SQL authentication",
-            1521: "Oracle DB - restrict network access and secure configuration",
-            3306: "MySQL - restrict network access and secure configuration",
-            3389: "RDP - use strong authentication and restrict network access",
-            5432: "PostgreSQL - restrict network access and secure configuration"
-        }
-        
-        if port_num in remediation_map:
-            return remediation_map[port_num]
+        if port_num in _PORT_REMEDIATION:
+            return _PORT_REMEDIATION[port_num]
         elif "telnet" in service_name:
             return "Replace Telnet with SSH for secure remote access"
         elif "ftp" in service_name:
@@ -556,7 +933,7 @@ class NmapScanner(BaseScanner):
         else:
             return f"Review necessity of {service_name} service and restrict network access if possible"
     
-    def _process_script_result(self, script_info: Dict[str, Any], target_host: str, port: str, protocol: str) -> Optional[VulnerabilityData]:
+    def _process_script_result(self, script_info: Dict[str, Any], target_host: str, port: int, protocol: str) -> Optional[VulnerabilityData]:
         """Process Nmap script results and convert to vulnerabilities"""
         script_id = script_info.get("id", "")
         script_output = script_info.get("output", "")
@@ -564,23 +941,9 @@ class NmapScanner(BaseScanner):
         if not script_output:
             return None
         
-        # Map script IDs to vulnerability types
-        vuln_scripts = {
-            "http-sql-injection": VulnerabilitySeverity.HIGH,
-            "http-xssed": VulnerabilitySeverity.HIGH,
-            "http-csrf": VulnerabilitySeverity.MEDIUM,
-            "http-slowloris-check": VulnerabilitySeverity.MEDIUM,
-            "smb-vuln-ms17-010": VulnerabilitySeverity.CRITICAL,
-            "smb-vuln-ms08-067": VulnerabilitySeverity.CRITICAL,
-            "ssl-poodle": VulnerabilitySeverity.MEDIUM,
-            "ssl-heartbleed": VulnerabilitySeverity.HIGH
-        }
-        
-        severity = vuln_scripts.get(script_id, VulnerabilitySeverity.INFO)
-        
         # Only create vulnerabilities for actual issues found
-        if any(keyword in script_output.lower() for keyword in ["vulnerable", "found", "detected", "exposed"]):
-            severity = vuln_scripts.get(script_id, VulnerabilitySeverity.MEDIUM)
+        if _SCRIPT_FINDING_RE.search(script_output):
+            severity = _SCRIPT_SEVERITY.get(script_id, VulnerabilitySeverity.MEDIUM)
         else:
             severity = VulnerabilitySeverity.INFO
         
@@ -592,28 +955,19 @@ class NmapScanner(BaseScanner):
             solution=f"Review and remediate issues identified by Nmap script {script_id}",
             affected_url=f"{target_host}:{port}",
             evidence={"script_output": script_output, "script_id": script_id},
-            tags=["script-scan", "nmap", script_id],
+            tags=_script_tags(script_id),
             confidence="Medium"
         )
     
     async def _get_nmap_version(self) -> str:
         """Get Nmap version information"""
-        try:
-            result = subprocess.run(
-                [self.nmap_executable, "--version"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                # Extract version from first line
-                version_line = result.stdout.split('\n')[0]
-                match = re.search(r'(\d+\.\d+)', version_line)
-                if match:
-                    return match.group(1)
-                return version_line.strip()
-        except:
-            pass
+        # The health check runs `nmap --version` once and keeps its first line
+        if await self.health_check():
+            # Extract version from first line
+            match = re.search(r'(\d+\.\d+)', self._version_line)
+            if match:
+                return match.group(1)
+            return self._version_line.strip()
         return "unknown"
     
     def get_supported_options(self) -> List[str]:
@@ -185,7 +185,11 @@ class ScanJobManager:
                     
                     # Execute scan
                     logger.info(f"Running {scan_type.value} scan against {target_url}")
-                    result = await scanner.scan(target_url, options)
+                    try:
+                        result = await scanner.scan(target_url, options)
+                    finally:
+                        # Deliver any progress update the scanner is still holding back
+                        scanner.flush_progress()
                     
                     if result.status == "completed":
                         all_results.append(result)
@@ -55,7 +55,7 @@ async def debug_register():
                 print("   Usuario não existe - OK")
             
             print("\n2. Validando senha...")
-            from app.core.security import security
+            from app.core import security
             is_strong, message = security.is_strong_password(password)
             print(f"   Validação: {is_strong} - {message}")
             
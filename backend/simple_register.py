@@ -10,7 +10,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.core.database import AsyncSessionLocal
 from app.models.user import User
-from app.core.security import SecurityManager
+from app.core import security
 from datetime import datetime
 from sqlalchemy import select
 
@@ -33,7 +33,6 @@ async def test_simple_register():
                 await db.commit()
             
             # Validar senha
-            security = SecurityManager()
             is_strong, message = security.is_strong_password(password)
             print(f"Validação de senha: {is_strong} - {message}")
             
@@ -78,7 +77,6 @@ async def authenticate_user_simple(db, email: str, password: str):
         if not user:
             return None
         
-        security = SecurityManager()
         if not security.verify_password(password, user.password_hash):
             return None
         
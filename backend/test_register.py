@@ -10,7 +10,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.core.database import AsyncSessionLocal
 from app.models.user import User
-from app.core.security import SecurityManager
+from app.core import security
 from datetime import datetime
 
 async def test_register():
@@ -20,7 +20,6 @@ async def test_register():
             print("Testando criação de usuário...")
             
             # Criar usuário
-            security = SecurityManager()
             user = User(
                 email="test@example.com",
                 password_hash=security.hash_password("TesteSenha123"),
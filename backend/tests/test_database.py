@@ -0,0 +1,131 @@
+"""
+Tests for the startup indexes and the scan findings ON CONFLICT insert
+"""
+
+import importlib.util
+import os
+import re
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core import database
+from app.core.database import _REQUIRED_INDEXES, create_required_indexes
+
+FINDINGS_INDEX = "idx_vulnerabilities_scan_finding"
+REPORTS_INDEX = "idx_reports_scan_id_created_at"
+
+
+def _load_scanner_engine_module():
+    """Load app/services/scanner_engine.py, which the scanner_engine package shadows"""
+    path = Path(__file__).resolve().parents[1] / "app" / "services" / "scanner_engine.py"
+    spec = importlib.util.spec_from_file_location("scanner_engine_module", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _normalize(sql: str) -> str:
+    return re.sub(r"[\s()]", "", sql).lower()
+
+
+class FakeResult:
+    def __init__(self, names):
+        self.names = names
+
+    def scalars(self):
+        return iter(self.names)
+
+
+class FakeConnection:
+    """Records executed SQL and reports the given indexes as present"""
+
+    def __init__(self, existing=()):
+        self.existing = list(existing)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement))
+        return FakeResult(self.existing)
+
+
+@pytest.mark.asyncio
+async def test_missing_indexes_are_created():
+    conn = FakeConnection()
+
+    await create_required_indexes(conn)
+
+    assert "pg_indexes" in conn.statements[0]
+    executed = conn.statements[1:]
+    assert len(executed) == 3
+    # Duplicates are removed before the unique index is built
+    assert executed[0].startswith("DELETE FROM vulnerabilities")
+    assert executed[1].startswith(f"CREATE UNIQUE INDEX IF NOT EXISTS {FINDINGS_INDEX}")
+    assert REPORTS_INDEX in executed[2]
+
+
+@pytest.mark.asyncio
+async def test_existing_indexes_are_left_alone():
+    conn = FakeConnection(existing=[FINDINGS_INDEX, REPORTS_INDEX, "vulnerabilities_pkey"])
+
+    await create_required_indexes(conn)
+
+    assert len(conn.statements) == 1
+
+
+def test_findings_conflict_target_matches_unique_index():
+    # ON CONFLICT only works when its target is exactly the unique index's key
+    insert = _load_scanner_engine_module()._INSERT_FINDINGS
+    compiled = insert.compile(dialect=postgresql.dialect())
+    conflict_target = re.search(r"ON CONFLICT \((.*)\) DO NOTHING", str(compiled)).group(1)
+    # Bound literals in the conflict target, e.g. the COALESCE default
+    conflict_target = re.sub(
+        r"%\((\w+)\)s", lambda match: repr(compiled.params[match.group(1)]), conflict_target
+    )
+
+    index_sql = str(_REQUIRED_INDEXES[FINDINGS_INDEX][-1])
+    index_key = re.search(r"ON vulnerabilities\((.*)\)$", index_sql).group(1)
+
+    assert _normalize(conflict_target) == _normalize(index_key)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+async def test_duplicate_findings_are_skipped_on_postgres():
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.models import user, scan, vulnerability, report, conversation
+    from app.models.scan import Scan
+    from app.models.vulnerability import Vulnerability
+
+    insert = _load_scanner_engine_module()._INSERT_FINDINGS
+    url = os.environ["TEST_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    engine = create_async_engine(url)
+
+    try:
+        # Never committed, so the test database is left as it was
+        async with engine.connect() as conn:
+            await conn.run_sync(database.Base.metadata.create_all)
+            await create_required_indexes(conn)
+
+            scan_id = uuid.uuid4()
+            await conn.execute(Scan.__table__.insert().values(id=scan_id, target_url="https://example.com"))
+            finding = {
+                "scan_id": scan_id,
+                "vulnerability_id": "nmap_port_22",
+                "severity": "info",
+                "title": "Open port 22",
+                "affected_url": "https://example.com",
+                "affected_parameter": None,
+            }
+            await conn.execute(insert, [dict(finding, id=uuid.uuid4()), dict(finding, id=uuid.uuid4())])
+
+            count = await conn.scalar(
+                select(func.count()).select_from(Vulnerability).where(Vulnerability.scan_id == scan_id)
+            )
+            assert count == 1
+    finally:
+        await engine.dispose()
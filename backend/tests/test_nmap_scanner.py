@@ -0,0 +1,103 @@
+"""
+Tests for the Nmap scanner's output format selection and greppable parsing
+"""
+
+import pytest
+
+from app.services.scanner_engine.nmap_scanner import NmapScanner
+
+PLAIN_PORT_SCAN = {
+    "enable_service_detection": False,
+    "enable_version_detection": False,
+    "enable_os_detection": False,
+    "enable_scripts": False,
+}
+
+
+def _output_flag(scanner: NmapScanner) -> str:
+    return next(arg for arg in scanner._argv_template if arg in ("-oG", "-oX"))
+
+
+def test_default_scan_uses_xml_output():
+    scanner = NmapScanner()
+
+    assert scanner._output_mode == "xml"
+    assert _output_flag(scanner) == "-oX"
+
+
+@pytest.mark.parametrize("option", sorted(PLAIN_PORT_SCAN))
+def test_any_detection_keeps_xml_output(option):
+    # Greppable output loses the product/version split, so e.g. -sV alone needs XML
+    scanner = NmapScanner({**PLAIN_PORT_SCAN, option: True})
+
+    assert scanner._output_mode == "xml"
+    assert _output_flag(scanner) == "-oX"
+
+
+def test_plain_port_scan_uses_grep_output():
+    scanner = NmapScanner(PLAIN_PORT_SCAN)
+
+    assert scanner._output_mode == "grep"
+    assert _output_flag(scanner) == "-oG"
+
+
+@pytest.fixture
+def batch_scanner(monkeypatch):
+    """A plain port scanner whose Nmap run records the command instead of executing it"""
+    scanner = NmapScanner(PLAIN_PORT_SCAN)
+    commands = []
+
+    async def health_check():
+        return True
+
+    async def get_nmap_version():
+        return "Nmap version 7.94"
+
+    async def execute_nmap_scan(command, max_hosts=1):
+        commands.append(command)
+        return b"", []
+
+    monkeypatch.setattr(scanner, "health_check", health_check)
+    monkeypatch.setattr(scanner, "_get_nmap_version", get_nmap_version)
+    monkeypatch.setattr(scanner, "_execute_nmap_scan", execute_nmap_scan)
+    scanner.commands = commands
+    return scanner
+
+
+@pytest.mark.asyncio
+async def test_batch_scan_of_addresses_keeps_grep_output(batch_scanner):
+    await batch_scanner.scan_many(["http://10.0.0.1", "http://10.0.0.2"])
+
+    command = batch_scanner.commands[0]
+    assert "-oG" in command
+    assert "-oX" not in command
+
+
+@pytest.mark.asyncio
+async def test_batch_scan_of_hostnames_switches_to_xml_output(batch_scanner):
+    # -oG with -n names hosts only by address, so hostname targets could not be matched
+    await batch_scanner.scan_many(["http://10.0.0.1", "https://example.com"])
+
+    command = batch_scanner.commands[0]
+    assert "-oX" in command
+    assert "-oG" not in command
+
+
+def test_parse_grep_output():
+    scanner = NmapScanner(PLAIN_PORT_SCAN)
+    output = (
+        b"# Nmap 7.94 scan initiated\n"
+        b"Host: 10.0.0.1 ()\tStatus: Up\n"
+        b"Host: 10.0.0.1 ()\tPorts: 22/open/tcp//ssh///, 80/closed/tcp//http///\n"
+        b"Host: 10.0.0.2 (db.internal)\tPorts: 5432/open/tcp//postgresql///\n"
+    )
+
+    hosts = scanner._parse_grep_output(output, max_hosts=None)
+
+    assert len(hosts) == 2
+    first, second = hosts
+    assert first["names"] == ["10.0.0.1"]
+    assert first["closed_ports"] == 1
+    assert [(port.port, port.protocol, port.service["name"]) for port in first["ports"]] == [(22, "tcp", "ssh")]
+    assert second["names"] == ["10.0.0.2", "db.internal"]
+    assert second["ports"][0].port == 5432
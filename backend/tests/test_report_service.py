@@ -0,0 +1,143 @@
+"""
+Tests for PDF report generation and the report background task
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from app.models.report import ReportStatus
+from app.services import report_service
+from app.services.report_service import (
+    PDFReportGenerator,
+    ReportService,
+    ScanSnapshot,
+    SEVERITY_LEVELS,
+    VulnerabilitySnapshot,
+)
+
+
+def _make_snapshot(findings: int, title: str = "Finding", description: str = "Description") -> ScanSnapshot:
+    """Build an ORM-free scan snapshot with the given number of findings"""
+    vulnerabilities = VulnerabilitySnapshot()
+    for index in range(findings):
+        severity = index % len(SEVERITY_LEVELS)
+        vulnerabilities.titles.append(f"{title} {index}")
+        vulnerabilities.descriptions.append(f"{description} {index}. " * 20)
+        vulnerabilities.solutions.append(f"Fix {index}. " * 10)
+        vulnerabilities.severities.append(severity)
+        vulnerabilities.cvss_scores.append(7.5)
+        vulnerabilities.urls.append(f"https://example.com/page/{index}?a=1&b=2")
+        vulnerabilities.cve_ids.append(None)
+        vulnerabilities.parameters.append("q")
+        vulnerabilities.sort_keys.append((len(SEVERITY_LEVELS) - severity, 7.5))
+
+    now = datetime(2024, 1, 31, 12, 0, 0)
+    return ScanSnapshot(
+        id="00000000-0000-0000-0000-000000000001",
+        scan_number=1000,
+        target_url="https://example.com/?a=1&b=2",
+        scan_types=["owasp_zap", "nmap"],
+        status="completed",
+        environment_type=None,
+        options={"depth": 2},
+        duration_seconds=42,
+        created_at=now,
+        started_at=now,
+        completed_at=now,
+        risk_score=80.0,
+        vulnerabilities=vulnerabilities,
+    )
+
+
+@pytest.fixture
+def generator():
+    return PDFReportGenerator()
+
+
+@pytest.mark.parametrize("findings", [0, 20, 60, 300])
+def test_technical_report_builds_for_any_number_of_findings(generator, tmp_path, findings):
+    output_path = tmp_path / "technical.pdf"
+
+    size = generator._build_technical_report(_make_snapshot(findings), str(output_path))
+
+    assert size > 0
+    assert output_path.read_bytes().startswith(b"%PDF")
+
+
+def test_markup_in_scanner_text_does_not_break_reports(generator, tmp_path):
+    snapshot = _make_snapshot(
+        15,
+        title="<script>alert(1)</script> & <b",
+        description="Reflected <img src=x onerror=alert(1)> & unclosed <tag"
+    )
+
+    assert generator._build_executive_summary(snapshot, str(tmp_path / "executive.pdf")) > 0
+    assert generator._build_technical_report(snapshot, str(tmp_path / "technical.pdf")) > 0
+
+
+def test_generator_builds_several_reports_in_a_row(generator, tmp_path):
+    # Pool workers reuse one generator, so no flowable may carry state between builds
+    for run in range(3):
+        assert generator._build_executive_summary(_make_snapshot(60), str(tmp_path / f"executive_{run}.pdf")) > 0
+        assert generator._build_technical_report(_make_snapshot(60), str(tmp_path / f"technical_{run}.pdf")) > 0
+
+
+@pytest.mark.asyncio
+async def test_report_task_updates_report_through_its_own_session(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    report = SimpleNamespace(status=ReportStatus.GENERATING, file_path=None, file_size=None)
+    sessions = []
+
+    class TaskSession:
+        async def get(self, model, report_id):
+            assert report_id == "report-1"
+            return report
+
+    @asynccontextmanager
+    async def fake_db_session():
+        session = TaskSession()
+        sessions.append(session)
+        yield session
+
+    async def fake_executive_summary(scan, output_path):
+        return output_path, 1234
+
+    monkeypatch.setattr(report_service, "get_db_session", fake_db_session)
+
+    # The request session is closed by the time the task runs; it must not be used
+    service = ReportService(db=None)
+    service.pdf_generator = SimpleNamespace(generate_executive_summary=fake_executive_summary)
+
+    await service._generate_report_async("report-1", SimpleNamespace(scan_number=1000), "executive")
+
+    assert len(sessions) == 1
+    assert report.status == ReportStatus.COMPLETED
+    assert report.file_size == 1234
+    assert report.file_path.endswith(".pdf")
+
+
+@pytest.mark.asyncio
+async def test_report_task_marks_report_failed_through_its_own_session(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    report = SimpleNamespace(status=ReportStatus.GENERATING, error_message=None)
+
+    class TaskSession:
+        async def get(self, model, report_id):
+            return report
+
+    @asynccontextmanager
+    async def fake_db_session():
+        yield TaskSession()
+
+    monkeypatch.setattr(report_service, "get_db_session", fake_db_session)
+
+    service = ReportService(db=None)
+    await service._generate_report_async("report-1", SimpleNamespace(scan_number=1000), "unknown")
+
+    assert report.status == ReportStatus.FAILED
+    assert "Unknown report type" in report.error_message
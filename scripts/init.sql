@@ -59,6 +59,7 @@ CREATE TABLE IF NOT EXISTS vulnerabilities (
     description TEXT NOT NULL,
     solution TEXT,
     affected_url VARCHAR(500) NOT NULL,
+    affected_parameter VARCHAR(255),
     evidence JSONB DEFAULT '{}',
     attack_vector VARCHAR(50),
     attack_complexity VARCHAR(50),
@@ -134,7 +135,9 @@ CREATE TABLE IF NOT EXISTS user_sessions (
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scans_user_id_created_at ON scans(user_id, created_at DESC);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vulnerabilities_scan_id_severity ON vulnerabilities(scan_id, severity);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vulnerabilities_cve_id ON vulnerabilities(cve_id) WHERE cve_id IS NOT NULL;
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_vulnerabilities_scan_finding ON vulnerabilities(scan_id, vulnerability_id, affected_url, (COALESCE(affected_parameter, '')));
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reports_scan_id_type ON reports(scan_id, report_type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reports_scan_id_created_at ON reports(scan_id, created_at DESC);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_conversations_user_id ON conversations(user_id, created_at DESC);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_messages_conversation_id ON messages(conversation_id, created_at);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_sessions_token ON user_sessions(session_token);